@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Benchmark toolbox.libparser against ThermoLibrary.load and KineticsLibrary.load
+on a synthetic thermo library and a synthetic kinetics library
+
+Usage: python benchmarks/libparser.py [number of entries]
+"""
+
+import itertools
+import os
+import sys
+import tempfile
+import time
+
+from rmgpy.chemkin import load_species_dictionary
+from rmgpy.data.kinetics import KineticsLibrary
+from rmgpy.data.thermo import ThermoDatabase, ThermoLibrary
+from rmgpy.molecule.molecule import Molecule
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from toolbox.kineticlib import get_kinetics_contexts
+from toolbox.libparser import build_library, parse_library
+
+##################################################################
+
+ENTRY = '''entry(
+    index = {0},
+    label = "{1}",
+    molecule =
+"""
+{2}""",
+    thermo = NASA(
+        polynomials = [
+            NASAPolynomial(coeffs=[3.51,0.0124,-4.3e-06,-1.2e-09,8.9e-13,-24560.1,9.87], Tmin=(100,'K'), Tmax=(1000,'K')),
+            NASAPolynomial(coeffs=[7.12,0.0113,-5.1e-06,1.0e-09,-7.5e-14,-25600.4,-9.12], Tmin=(1000,'K'), Tmax=(5000,'K')),
+        ],
+        Tmin = (100,'K'),
+        Tmax = (5000,'K'),
+    ),
+    shortDesc = u"""synthetic""",
+    longDesc =
+u"""
+Synthetic entry {0} for benchmarking.
+""",
+)
+
+'''
+
+RXN_ENTRY = '''entry(
+    index = {0},
+    label = "{1} <=> {2}",
+    kinetics = Arrhenius(A=(1e+13,'s^-1'), n=0.5, Ea=(30,'kcal/mol'), T0=(1,'K')),
+    shortDesc = u"""synthetic""",
+)
+
+'''
+
+
+def get_smiles_list(n_species):
+    """
+    Generate n_species SMILES of distinct acyclic molecules made of C, N and O
+    """
+    smiles_list = []
+    for length in itertools.count(1):
+        for atoms in itertools.product('CNO', repeat=length):
+            smiles = ''.join(atoms)
+            # A chain and its reverse are the same molecule
+            if smiles <= smiles[::-1]:
+                smiles_list.append(smiles)
+            if len(smiles_list) == n_species:
+                return smiles_list
+
+
+def write_library(path, n_entries):
+    """
+    Write a thermo library containing n_entries entries of distinct molecules
+    """
+    with open(path, 'w') as f:
+        f.write('#!/usr/bin/env python\n# encoding: utf-8\n\n')
+        f.write('name = "benchmark"\nshortDesc = u""\nlongDesc = u"""\n"""\n')
+        for index, smiles in enumerate(get_smiles_list(n_entries), 1):
+            f.write(ENTRY.format(index, smiles, Molecule().from_smiles(smiles).to_adjacency_list()))
+
+
+def get_isomer_pairs(n_pairs):
+    """
+    Generate n_pairs pairs of SMILES of distinct acyclic isomers made of C, N and O
+    """
+    pairs = []
+    for length in itertools.count(2):
+        isomers = {}
+        for atoms in itertools.product('CNO', repeat=length):
+            smiles = ''.join(atoms)
+            # A chain and its reverse are the same molecule
+            if smiles <= smiles[::-1]:
+                isomers.setdefault(''.join(sorted(atoms)), []).append(smiles)
+        for smiles_list in isomers.values():
+            for pair in zip(smiles_list, smiles_list[1:]):
+                pairs.append(pair)
+                if len(pairs) == n_pairs:
+                    return pairs
+
+
+def write_kinetics_library(lib_dir, n_entries):
+    """
+    Write a kinetics library containing n_entries isomerization reactions
+    and its species dictionary
+    """
+    pairs = get_isomer_pairs(n_entries)
+    with open(os.path.join(lib_dir, 'dictionary.txt'), 'w') as f:
+        for smiles in sorted(set(itertools.chain(*pairs))):
+            f.write(Molecule().from_smiles(smiles).to_adjacency_list(label=smiles) + '\n')
+    with open(os.path.join(lib_dir, 'reactions.py'), 'w') as f:
+        f.write('#!/usr/bin/env python\n# encoding: utf-8\n\n')
+        f.write('name = "benchmark"\nshortDesc = u""\nlongDesc = u"""\n"""\n')
+        for index, pair in enumerate(pairs, 1):
+            f.write(RXN_ENTRY.format(index, *pair))
+
+
+def build_kinetics_library(lib_dir, context):
+    """
+    Build a kinetics library with its species dictionary by toolbox.libparser
+    """
+    spc_dict = load_species_dictionary(os.path.join(lib_dir, 'dictionary.txt'))
+    return build_library(os.path.join(lib_dir, 'reactions.py'), KineticsLibrary(),
+                         context, spc_dict=spc_dict)
+
+
+def time_it(func, *args):
+    """
+    Return the wall time of calling func
+    """
+    t0 = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - t0
+
+
+def main(n_entries=2000):
+    thermo_db = ThermoDatabase()
+    local_context, global_context = get_kinetics_contexts()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'benchmark.py')
+        write_library(path, n_entries)
+        t_load = time_it(ThermoLibrary().load, path, thermo_db.local_context,
+                         thermo_db.global_context)
+        t_parse = time_it(parse_library, path)
+        t_build = time_it(build_library, path, ThermoLibrary(), thermo_db.global_context)
+        write_kinetics_library(tmp_dir, n_entries)
+        rxn_path = os.path.join(tmp_dir, 'reactions.py')
+        t_rxn_load = time_it(KineticsLibrary().load, rxn_path, local_context, global_context)
+        t_rxn_parse = time_it(parse_library, rxn_path)
+        t_rxn_build = time_it(build_kinetics_library, tmp_dir, global_context)
+    print('{0:>22}: {1:.2f} s ({2} entries)'.format('ThermoLibrary.load', t_load, n_entries))
+    print('{0:>22}: {1:.2f} s'.format('parse_library', t_parse))
+    print('{0:>22}: {1:.2f} s'.format('build_library', t_build))
+    print('{0:>22}: {1:.2f} s ({2} entries)'.format('KineticsLibrary.load', t_rxn_load, n_entries))
+    print('{0:>22}: {1:.2f} s'.format('parse_library', t_rxn_parse))
+    print('{0:>22}: {1:.2f} s'.format('build_library', t_rxn_build))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
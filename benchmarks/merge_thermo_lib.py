@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark toolbox.thermolib.merge_thermo_lib on synthetic thermo libraries
+of increasing sizes. The libraries have no species in common, which is the
+worst case of the duplicate check, so the time per entry should stay
+about constant as the libraries grow.
+
+Usage: python benchmarks/merge_thermo_lib.py [largest number of entries]
+"""
+
+import itertools
+import logging
+import os
+import sys
+import time
+
+from rmgpy.data.base import Entry
+from rmgpy.data.thermo import ThermoLibrary
+from rmgpy.molecule.molecule import Molecule
+from rmgpy.thermo import ThermoData
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from toolbox.thermolib import merge_thermo_lib
+
+##################################################################
+
+
+def get_smiles_list(n_species):
+    """
+    Generate n_species SMILES of distinct acyclic molecules made of C, N and O
+    """
+    smiles_list = []
+    for length in itertools.count(1):
+        for atoms in itertools.product('CNO', repeat=length):
+            smiles = ''.join(atoms)
+            # A chain and its reverse are the same molecule
+            if smiles <= smiles[::-1]:
+                smiles_list.append(smiles)
+            if len(smiles_list) == n_species:
+                return smiles_list
+
+
+def get_library(label, smiles_list):
+    """
+    Create a thermo library of the molecules with placeholder thermo data
+    """
+    lib = ThermoLibrary(label=label)
+    for index, smiles in enumerate(smiles_list):
+        lib.entries[smiles] = Entry(
+            index=index,
+            label=smiles,
+            item=Molecule().from_smiles(smiles),
+            data=ThermoData(Tdata=([300, 400, 500, 600, 800, 1000, 1500], 'K'),
+                            Cpdata=([10, 11, 12, 13, 14, 15, 16], 'cal/(mol*K)'),
+                            H298=(0, 'kcal/mol'), S298=(50, 'cal/(mol*K)')),
+            short_desc='',
+        )
+    return lib
+
+
+def main(max_entries=2000):
+    logging.disable(logging.INFO)
+    n_entries = 250
+    while n_entries <= max_entries:
+        smiles_list = get_smiles_list(2 * n_entries)
+        base_lib = get_library('base', smiles_list[::2])
+        lib_to_add = get_library('to_add', smiles_list[1::2])
+        t0 = time.perf_counter()
+        merge_thermo_lib(base_lib, lib_to_add)
+        t_merge = time.perf_counter() - t0
+        print('{0:>6} + {0:<6} entries: {1:.2f} s, {2:.2f} ms per entry'.format(
+            n_entries, t_merge, 1000 * t_merge / n_entries))
+        n_entries *= 2
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark the yaml helpers in toolbox.base against the pure-Python
+loader and dumper on a synthetic species input file
+
+Usage: python benchmarks/yaml_io.py [number of species]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from toolbox.base import YamlDumper, YamlLoader, read_yaml_file, write_yaml_file
+
+##################################################################
+
+ADJLIST = """multiplicity 2
+1 O u1 p2 c0 {4,S}
+2 O u0 p2 c0 {4,D}
+3 C u0 p0 c0 {4,S} {5,S} {6,S} {7,S}
+4 C u0 p0 c0 {1,S} {2,D} {3,S}
+5 H u0 p0 c0 {3,S}
+6 H u0 p0 c0 {3,S}
+7 H u0 p0 c0 {3,S}
+"""
+
+
+def get_species_input(n_species):
+    """
+    Generate an ARC-like input containing n_species species
+    """
+    species = [{'label': 'S{0}'.format(i),
+                'smiles': 'CC(=O)[O]',
+                'adjlist': ADJLIST,
+                'multiplicity': 2} for i in range(n_species)]
+    return {'project': 'benchmark', 'level_of_theory': 'cbs-qb3', 'species': species}
+
+
+def time_it(func, *args):
+    """
+    Return the wall time of calling func
+    """
+    t0 = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - t0
+
+
+def write_pure_python(path, data):
+    with open(path, 'w') as f:
+        f.write(yaml.dump(data=data))
+
+
+def read_pure_python(path):
+    with open(path, 'r') as f:
+        return yaml.load(stream=f, Loader=yaml.FullLoader)
+
+
+def main(n_species=10000):
+    data = get_species_input(n_species)
+    print('Loader: {0}, Dumper: {1}'.format(YamlLoader.__name__, YamlDumper.__name__))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'input.yml')
+        for name, write, read in [('pure python', write_pure_python, read_pure_python),
+                                  ('toolbox.base', write_yaml_file, read_yaml_file)]:
+            t_write = time_it(write, path, data)
+            t_read = time_it(read, path)
+            print('{0:>14}: write {1:.2f} s, read {2:.2f} s ({3} species)'.format(
+                name, t_write, t_read, n_species))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -3,30 +3,348 @@
 The toolbox for common tasks
 """
 
+import hashlib
+import json
 import logging
+import mmap
 import os
+import pickle
 import re
+import sqlite3
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
 import yaml
 
 from rmgpy.species import Species
 
+# Use the LibYAML bindings if available
+try:
+    from yaml import CFullLoader as YamlLoader, CDumper as YamlDumper
+except ImportError:
+    from yaml import FullLoader as YamlLoader, Dumper as YamlDumper
+
+# The umask is only accessible by setting it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
 ##################################################################
 
+# The directory to store the persistent caches of the toolbox
+CACHE_DIR = os.environ.get('RMG_TOOLS_CACHE_DIR',
+                           os.path.join(os.path.expanduser('~'), '.rmg_tools'))
+
+
 def read_yaml_file(path):
     """A handy function for reading yaml files"""
-    with open(path, 'r') as f:     
-        content = yaml.load(stream=f, Loader=yaml.FullLoader)
+    with open(path, 'r') as f:
+        content = yaml.load(stream=f, Loader=YamlLoader)
     return content
 
 
 def write_yaml_file(path, data):
     """A handy function for writing yaml files"""
-    content = yaml.dump(data=data)
+    with atomic_open(path) as f:
+        yaml.dump(data=data, stream=f, Dumper=YamlDumper)
+
+
+@contextmanager
+def atomic_open(path, mode='w'):
+    """
+    Open a temporary file next to the path for writing, which replaces
+    the file at the path only if the writing succeeds. The missing
+    directories are created.
+
+    Args:
+        path (str): The path to the file
+        mode (str): The mode used to open the temporary file
+    """
     dir_path = os.path.dirname(path)
     if not os.path.exists(dir_path) and dir_path:
-        os.makedirs(os.path.dirname(path))
-    with open(path, 'w+') as f:
-        f.write(content)
+        os.makedirs(dir_path)
+    fd, tmp_path = tempfile.mkstemp(dir=dir_path or '.',
+                                    prefix='.' + os.path.basename(path) + '.')
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        # Keep the permissions as if the file is written in place
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        else:
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def get_file_digest(*paths):
+    """
+    Get the SHA-1 digest of the contents of one or several files
+
+    Args:
+        paths (str): The paths to the files
+
+    Returns:
+        (str): The hexadecimal digest
+    """
+    sha1 = hashlib.sha1()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+def read_file_cache(category, paths, cache_dir=None):
+    """
+    Read the object cached for the files. The cache is valid if the sizes
+    and the modification times of the files are unchanged, or if the
+    contents of the files have the same digest
+
+    Args:
+        category (str): The category of the cache, e.g., 'kinetics_libraries'
+        paths (list): The paths to the files the object is read from
+        cache_dir (str): The directory of the caches. By default, CACHE_DIR
+
+    Returns:
+        The cached object. None if the cache is not available or stale
+    """
+    cache_path = _get_file_cache_path(category, paths, cache_dir)
+    if not os.path.isfile(cache_path):
+        return
+    try:
+        with open(cache_path, 'rb') as f:
+            # The object is only unpickled if the cache is valid
+            if not _is_file_cache_valid(pickle.load(f), paths):
+                return
+            return pickle.load(f)
+    except Exception as e:
+        logging.debug('The cache {0} is not readable ({1}).'.format(cache_path, e))
+
+
+def has_file_cache(category, paths, cache_dir=None):
+    """
+    Check if a valid cache of the files exists, without reading the cached object
+
+    Args:
+        category (str): The category of the cache, e.g., 'kinetics_libraries'
+        paths (list): The paths to the files the object is read from
+        cache_dir (str): The directory of the caches. By default, CACHE_DIR
+
+    Returns:
+        (bool): True if the cache is available and valid
+    """
+    cache_path = _get_file_cache_path(category, paths, cache_dir)
+    if not os.path.isfile(cache_path):
+        return False
+    try:
+        with open(cache_path, 'rb') as f:
+            return _is_file_cache_valid(pickle.load(f), paths)
+    except Exception as e:
+        logging.debug('The cache {0} is not readable ({1}).'.format(cache_path, e))
+        return False
+
+
+def write_file_cache(obj, category, paths, cache_dir=None):
+    """
+    Cache the object read from the files
+
+    Args:
+        obj: The picklable object read from the files
+        category (str): The category of the cache, e.g., 'kinetics_libraries'
+        paths (list): The paths to the files the object is read from
+        cache_dir (str): The directory of the caches. By default, CACHE_DIR
+    """
+    cache_path = _get_file_cache_path(category, paths, cache_dir)
+    try:
+        header = {'paths': [os.path.abspath(path) for path in paths],
+                  'stats': [_get_file_stat(path) for path in paths],
+                  'digest': get_file_digest(*paths)}
+        # The header and the object are pickled one after the other, so that
+        # the cache can be validated without unpickling the object
+        with atomic_open(cache_path, 'wb') as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        logging.debug('Failed to write the cache {0} ({1}).'.format(cache_path, e))
+
+
+def _is_file_cache_valid(header, paths):
+    """
+    Check the header of a cache against the sizes, the modification times
+    and if needed the digest of the files
+    """
+    stats = [_get_file_stat(path) for path in paths]
+    if [stat[0] for stat in stats] != [stat[0] for stat in header['stats']]:
+        return False
+    return stats == header['stats'] or header['digest'] == get_file_digest(*paths)
+
+
+def _get_file_cache_path(category, paths, cache_dir=None):
+    """
+    Get the path of the cache of the files, named by the digest of their paths
+    """
+    key = '\0'.join(os.path.abspath(path) for path in paths)
+    return os.path.join(cache_dir or CACHE_DIR, category,
+                        hashlib.sha1(key.encode('utf-8')).hexdigest() + '.pkl')
+
+
+def _get_file_stat(path):
+    """
+    Get the size and the modification time of the file
+    """
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def map_in_pool(func, items, processes=None, chunksize=None):
+    """
+    Lazily map a function over the items in a process pool. The results
+    are yielded in the order of the items as soon as they are available
+
+    Args:
+        func (function): A picklable function takes an item as input
+        items (list): The items
+        processes (int): The number of processes. Run in the current process if 1
+        chunksize (int): The number of items sent to a process at once. By default,
+                         each process receives about four chunks
+
+    Yields:
+        The result of each item
+    """
+    items = list(items)
+    if processes == 1 or len(items) < 2:
+        yield from map(func, items)
+        return
+    processes = processes or os.cpu_count() or 1
+    chunksize = chunksize or max(1, len(items) // (4 * processes))
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        yield from executor.map(func, items, chunksize=chunksize)
+
+
+def imap_in_pool(func, items, processes=None, initializer=None, initargs=(),
+                 max_pending=None):
+    """
+    Map a function over the items in a process pool while reading the items
+    lazily, so that at most max_pending items are held in memory. The results
+    are yielded in the order of the items.
+
+    Args:
+        func (function): A picklable function takes an item as input
+        items (iterable): The items, can be a generator
+        processes (int): The number of processes. Run in the current process if 1
+        initializer (function): A picklable function called once in each process
+        initargs (tuple): The arguments of the initializer
+        max_pending (int): The maximum number of items submitted but not yielded.
+                           By default, twice the number of processes
+
+    Yields:
+        The result of each item
+    """
+    if processes == 1:
+        if initializer:
+            initializer(*initargs)
+        yield from map(func, items)
+        return
+    processes = processes or os.cpu_count() or 1
+    max_pending = max_pending or 2 * processes
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=processes, initializer=initializer,
+                             initargs=initargs) as executor:
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def load_libs_in_pool(loader, lib_paths, use_cache=True, processes=None):
+    """
+    Load libraries in a process pool and time the loading of each library
+
+    Args:
+        loader (function): A picklable function loads a library given its path and
+                           use_cache, and returns None if the library is not valid
+        lib_paths (list): Paths to the library files
+        use_cache (bool): Use the cached libraries if the library files are unchanged
+        processes (int): The number of processes. Run in the current process if 1
+
+    Yields:
+        (tuple): The library path, the library (None if failed), and the loading time
+    """
+    yield from map_in_pool(_load_lib_timed,
+                           [(loader, lib_path, use_cache) for lib_path in lib_paths],
+                           processes=processes, chunksize=1)
+
+
+def read_libs_by_paths(loader, lib_paths, database, kind='', overwrite=False,
+                       use_cache=True, processes=None):
+    """
+    Read libraries given their file paths into a RMG database. The libraries are
+    loaded in a process pool and added to the database in the order of the paths.
+
+    Args:
+        loader (function): A picklable function loads a library given its path and
+                           use_cache, and returns None if the library is not valid
+        lib_paths (list): Paths to the library files
+        database (RMG ThermoDatabase/KineticsDatabase): RMG database object
+        kind (str): The kind of the libraries shown in the log
+        overwrite (bool): Reload the libraries already in the database
+        use_cache (bool): Use the cached libraries if the library files are unchanged
+        processes (int): The number of processes. Run in the current process if 1
+
+    Returns:
+        report (dict): The loaded libraries with their loading times in seconds,
+                       the failed libraries, and the skipped libraries
+    """
+    report = {'loaded': [], 'failed': [], 'skipped': []}
+    to_load = []
+    for lib_path in lib_paths:
+        if (lib_path in database.library_order and not overwrite) or lib_path in to_load:
+            report['skipped'].append(lib_path)
+        elif not os.path.exists(lib_path):
+            report['failed'].append(lib_path)
+            logging.error('The library file %s does not exist.' % (lib_path))
+        else:
+            to_load.append(lib_path)
+    start_time = time.time()
+    for lib_path, lib, load_time in load_libs_in_pool(loader, to_load, use_cache=use_cache,
+                                                      processes=processes):
+        if lib is None:
+            report['failed'].append(lib_path)
+            logging.error('The library file %s is not vaild.' % (lib_path))
+            continue
+        lib.label = lib_path
+        database.libraries[lib.label] = lib
+        if lib.label not in database.library_order:
+            database.library_order.append(lib.label)
+        report['loaded'].append((lib_path, load_time))
+        logging.info('Loaded {0} library {1} in {2:.2f} s'.format(kind, lib_path, load_time))
+    logging.info('{0} {1} libraries loaded in {2:.2f} s, {3} failed, {4} skipped.'.format(
+        len(report['loaded']), kind, time.time() - start_time, len(report['failed']),
+        len(report['skipped'])))
+    return report
+
+
+def _load_lib_timed(args):
+    """
+    Load a library and time it
+
+    Args:
+        args (tuple): The loader, the library path and whether to use the cache
+
+    Returns:
+        (tuple): The library path, the library (None if failed), and the loading time
+    """
+    loader, lib_path, use_cache = args
+    start_time = time.time()
+    lib = loader(lib_path, use_cache=use_cache)
+    return lib_path, lib, time.time() - start_time
 
 
 def string_representer(dumper, data):
@@ -94,6 +412,188 @@ def find_blocks(f, head_pat, tail_pat, regex=True, tail_count=1, block_count=1):
     return blk_ps
 
 
+def scan_blocks(file_path, patterns, regex=True):
+    """
+    Return lists of blocks for several pairs of head and tail patterns
+    by scanning the file only once. Each pair follows the same rules as
+    in ``find_blocks``, and the returned indices are byte offsets.
+
+    Args:
+        file_path (str): The path to the file
+        patterns (dict): A dict whose values are tuples of (head_pat, tail_pat),
+                         optionally followed by tail_count and block_count.
+                         The keys are used to label the results
+        regex (bool): Whether to use regex to search
+
+    Return:
+        blk_ps (dict): Lists of paired indices indicating the begining
+                       and the ending of the blocks for each pattern key
+    """
+    searchers = []
+    for key, pattern in patterns.items():
+        head_pat, tail_pat, tail_count, block_count = (tuple(pattern) + (1, 1))[:4]
+        searchers.append({'key': key,
+                          'head': _get_bytes_matcher(head_pat, regex),
+                          'tail': _get_bytes_matcher(tail_pat, regex),
+                          'tail_count': tail_count,
+                          'block_count': block_count,
+                          'mode': 'search',
+                          'blocks': []})
+    blk_ps = {searcher['key']: searcher['blocks'] for searcher in searchers}
+
+    with open(file_path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            return blk_ps
+        with mm:
+            active = searchers
+            line = mm.readline()
+            while line and active:
+                pos = mm.tell()
+                for searcher in active:
+                    if searcher['mode'] == 'search':
+                        if searcher['head'](line):
+                            searcher['mode'] = 'read'
+                            searcher['count'] = 0
+                            searcher['last_line'] = pos
+                            searcher['blocks'].append([pos, ])
+                    elif searcher['tail'](line):
+                        searcher['count'] += 1
+                        if searcher['count'] == searcher['tail_count']:
+                            searcher['blocks'][-1].append(searcher['last_line'])
+                            searcher['mode'] = 'search'
+                    else:
+                        searcher['last_line'] = pos
+                # Stop searching the patterns with enough blocks
+                active = [searcher for searcher in active
+                          if searcher['mode'] == 'read'
+                          or len(searcher['blocks']) < searcher['block_count']]
+                line = mm.readline()
+    # Remove the last incomplete search
+    for blocks in blk_ps.values():
+        if len(blocks) > 0 and len(blocks[-1]) == 1:
+            blocks.pop()
+    return blk_ps
+
+
+def _get_bytes_matcher(pat, regex=True):
+    """
+    Get a function checking if a line in bytes matches the pattern
+
+    Args:
+        pat (str/regex): Str pattern or regular expression
+        regex (bool): Whether to use regex to search
+
+    Returns:
+        (function): A function takes line in bytes as input
+    """
+    if hasattr(pat, 'pattern'):
+        pat = pat.pattern
+    if isinstance(pat, str):
+        pat = pat.encode('utf-8')
+    if regex:
+        return re.compile(pat).search
+    return lambda line: pat in line
+
+
+def scan_blocks_cached(file_path, patterns, regex=True, cache_dir=None, max_entries=10000):
+    """
+    Same as ``scan_blocks``, but the block offsets are stored in an on-disk
+    index keyed by the file path, size and modification time, so that
+    repeated analyses of the same file seek directly to the blocks. Stale
+    entries are replaced, and the least recently used entries are evicted
+    once the index holds more than max_entries patterns.
+
+    Args:
+        file_path (str): The path to the file
+        patterns (dict): A dict whose values are tuples of (head_pat, tail_pat),
+                         optionally followed by tail_count and block_count.
+                         The keys are used to label the results
+        regex (bool): Whether to use regex to search
+        cache_dir (str): The directory of the index. By default, CACHE_DIR
+        max_entries (int): The maximum number of patterns stored in the index
+
+    Return:
+        blk_ps (dict): Lists of paired indices indicating the begining
+                       and the ending of the blocks for each pattern key
+    """
+    file_path = os.path.abspath(file_path)
+    stat = os.stat(file_path)
+    pattern_keys = {key: _get_pattern_key(pattern, regex)
+                    for key, pattern in patterns.items()}
+    try:
+        conn = connect_cache_db('block_index', cache_dir=cache_dir)
+    except (sqlite3.Error, OSError) as e:
+        logging.debug('Block index is not available ({0}).'.format(e))
+        return scan_blocks(file_path, patterns, regex=regex)
+    blk_ps = {}
+    with conn:
+        conn.execute('CREATE TABLE IF NOT EXISTS blocks (path TEXT, pattern TEXT, '
+                     'size INTEGER, mtime INTEGER, offsets TEXT, accessed REAL, '
+                     'PRIMARY KEY (path, pattern))')
+        # Invalidate the entries of a modified file
+        conn.execute('DELETE FROM blocks WHERE path = ? AND (size != ? OR mtime != ?)',
+                     (file_path, stat.st_size, stat.st_mtime_ns))
+        rows = dict(conn.execute('SELECT pattern, offsets FROM blocks WHERE path = ?',
+                                 (file_path,)).fetchall())
+        for key, pattern_key in pattern_keys.items():
+            if pattern_key in rows:
+                blk_ps[key] = json.loads(rows[pattern_key])
+        conn.execute('UPDATE blocks SET accessed = ? WHERE path = ?',
+                     (time.time(), file_path))
+        # Search the patterns not in the index within a single pass
+        missing = {key: pattern for key, pattern in patterns.items()
+                   if key not in blk_ps}
+        if missing:
+            blk_ps.update(scan_blocks(file_path, missing, regex=regex))
+            conn.executemany('INSERT OR REPLACE INTO blocks VALUES (?, ?, ?, ?, ?, ?)',
+                             [(file_path, pattern_keys[key], stat.st_size,
+                               stat.st_mtime_ns, json.dumps(blk_ps[key]), time.time())
+                              for key in missing])
+            conn.execute('DELETE FROM blocks WHERE rowid IN (SELECT rowid FROM blocks '
+                         'ORDER BY accessed LIMIT max(0, (SELECT count(*) FROM blocks) - ?))',
+                         (max_entries,))
+    conn.close()
+    return blk_ps
+
+
+def _get_pattern_key(pattern, regex=True):
+    """
+    Get a str key representing the pattern used in scan_blocks
+
+    Args:
+        pattern (tuple): A tuple of (head_pat, tail_pat), optionally followed
+                         by tail_count and block_count
+        regex (bool): Whether to use regex to search
+
+    Returns:
+        (str): The key of the pattern
+    """
+    head_pat, tail_pat, tail_count, block_count = (tuple(pattern) + (1, 1))[:4]
+    return json.dumps([getattr(head_pat, 'pattern', head_pat),
+                       getattr(tail_pat, 'pattern', tail_pat),
+                       tail_count, block_count, regex])
+
+
+def connect_cache_db(name, cache_dir=None):
+    """
+    Connect to a SQLite database used as a persistent cache
+
+    Args:
+        name (str): The name of the cache
+        cache_dir (str): The directory of the cache. By default, CACHE_DIR
+
+    Returns:
+        conn (sqlite3.Connection): The connection to the cache database
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+    return sqlite3.connect(os.path.join(cache_dir, name + '.sqlite'), timeout=30)
+
+
 def get_files_by_regex(file_path, regex):
     """
     Get all the file paths corresponding the regex given
@@ -103,14 +603,85 @@ def get_files_by_regex(file_path, regex):
         regex (regex): The regular expression of the search
 
     Return:
-        file_list (list): A list of file paths
+        file_list (list): A sorted list of file paths
+    """
+    # Sorted since iter_files yields the paths in the order they are scanned
+    return sorted(iter_files(file_path, regex))
+
+
+def iter_files(file_path, regex=None, prune=None, max_workers=None):
+    """
+    Yield the paths of the files whose names match the regex. Directories are
+    scanned concurrently, so that the paths can be consumed before the walk
+    finishes. The order of the paths is not guaranteed unless max_workers is 1.
+
+    Args:
+        file_path (str): The directory which contains files to be found
+        regex (regex): The regular expression of the search. All files are
+                       yielded if not assigned
+        prune (list): Names of the directories to be skipped, e.g., ['conformers']
+        max_workers (int): The number of threads used to scan directories
+
+    Yields:
+        (str): The path of a file
     """
-    file_list = list()
-    for root, _, files in os.walk(file_path):
-        for file_name in files:
-            if re.search(regex, file_name):
-                file_list.append(os.path.join(root, file_name))
-    return file_list
+    match = re.compile(regex).search if regex else None
+    prune = set(prune or [])
+    # Scan the directories one by one
+    if max_workers == 1:
+        stack = [file_path]
+        while stack:
+            files, sub_dirs = _scan_dir(stack.pop(), match, prune)
+            stack.extend(reversed(sub_dirs))
+            yield from files
+        return
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = {executor.submit(_scan_dir, file_path, match, prune)}
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, sub_dirs = future.result()
+                for sub_dir in sub_dirs:
+                    pending.add(executor.submit(_scan_dir, sub_dir, match, prune))
+                yield from files
+    finally:
+        # Avoid scanning the rest of the tree if the consumer stops early
+        for future in pending:
+            future.cancel()
+        executor.shutdown()
+
+
+def _scan_dir(path, match=None, prune=None):
+    """
+    Scan a single directory. Similar to os.walk, symbolic links to
+    directories are not followed and unreadable directories are ignored.
+
+    Args:
+        path (str): The path to the directory
+        match (function): A function takes file name as input
+        prune (set): Names of the directories to be skipped
+
+    Returns:
+        files (list): The paths of the matched files
+        sub_dirs (list): The paths of the sub-directories to be scanned
+    """
+    files, sub_dirs = [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    if not entry.is_symlink() and entry.name not in (prune or []):
+                        sub_dirs.append(entry.path)
+                elif not match or match(entry.name):
+                    files.append(entry.path)
+    except OSError:
+        pass
+    return files, sub_dirs
 
 
 def read_block(f, start=0, end=0, action=None):
@@ -127,26 +698,93 @@ def read_block(f, start=0, end=0, action=None):
         lines (list): Lines between start and end. Only available
                       when action is not assigned. 
     """
-    # If end not assigned, then change it to the end of the file
-    if not end:
-        f.seek(0, 2)
-        end = f.tell()
     # If not action, then just return the corresponding lines
     lines = []
     if not action:
-        action = lambda line: lines.append(line)
-
+        action = lines.append
     # From start til end, perform action to each line
-    f.seek(start)
-    line = f.readline()
-    while f.tell() <= end and line != '':
+    for line in iter_block(f, start, end):
         action(line)
-        line = f.readline()
 
     if lines:
         return lines
 
 
+def iter_block(f, start=0, end=0, raw=False):
+    """
+    Lazily yield the lines from start to end. The file is memory-mapped,
+    so that only the current line is copied and the file position is not
+    checked for every line.
+
+    Args:
+        f (fileObject): A python fileObject
+        start (int): Start postion at the file object
+        end (int): End position at the file object
+        raw (bool): Whether to yield zero-copy memoryview slices of the
+                    raw bytes instead of decoded lines
+
+    Yields:
+        line (str/bytes/memoryview): A line between start and end
+    """
+    encoding = getattr(f, 'encoding', None)
+    try:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError):
+        # In-memory and empty files cannot be mapped
+        yield from _iter_block_by_readline(f, start, end)
+        return
+    # If end not assigned, then change it to the end of the file
+    if not end or end > len(mm):
+        end = len(mm)
+    view = memoryview(mm) if raw else None
+    pos = start
+    try:
+        while pos < end:
+            line_end = mm.find(b'\n', pos, end) + 1 or end
+            # Only complete lines are included
+            if line_end == end and mm[end - 1:end] != b'\n' and end < len(mm):
+                break
+            if raw:
+                yield view[pos:line_end]
+            elif encoding:
+                yield mm[pos:line_end].decode(encoding).replace('\r\n', '\n')
+            else:
+                yield mm[pos:line_end]
+            pos = line_end
+    finally:
+        if view is not None:
+            view.release()
+        try:
+            mm.close()
+        except BufferError:
+            # The slices yielded are still referred, leave it to the gc
+            pass
+
+
+def _iter_block_by_readline(f, start=0, end=0):
+    """
+    Yield the lines from start to end by reading the file object line
+    by line. Used when the file cannot be memory-mapped.
+
+    Args:
+        f (fileObject): A python fileObject
+        start (int): Start postion at the file object
+        end (int): End position at the file object
+
+    Yields:
+        line (str/bytes): A line between start and end
+    """
+    # If end not assigned, then change it to the end of the file
+    if not end:
+        f.seek(0, 2)
+        end = f.tell()
+    f.seek(start)
+    line = f.readline()
+    while f.tell() <= end and line:
+        yield line
+        line = f.readline()
+
+
 def get_files_by_suffixes(file_path, suffixes):
     """
     Get all the file paths corresponding the suffixes given
@@ -156,15 +794,9 @@ def get_files_by_suffixes(file_path, suffixes):
         suffixes (list): A list of file suffixes in str
 
     Returns:
-        file_list (list): A list of file paths
-    """
-    file_list = list()
-    for root, _, files in os.walk(file_path):
-        for file_name in files:
-            for suffix in suffixes:
-                regex = r'\S*' + suffix + '$'
-                match = re.match(regex, file_name)
-                if match:
-                    file_list.append(os.path.join(root, file_name))
-                    break
-    return file_list
+        file_list (list): A sorted list of file paths
+    """
+    if not suffixes:
+        return list()
+    regex = r'^\S*(?:' + '|'.join(suffixes) + ')$'
+    return sorted(iter_files(file_path, regex))
@@ -12,31 +12,59 @@ import cclib
 from arkane.gaussian import GaussianLog
 from rmgpy.constants import Na, E_h
 
-from toolbox.base import find_blocks, get_files_by_suffixes, read_block
+from toolbox.base import get_files_by_suffixes, read_block, scan_blocks, scan_blocks_cached
 
 ##################################################################
 
-def parse_gauss_options(file_path):
+# The head and tail patterns of the blocks parsed from gaussian outputs
+# The option example:
+# ---------------------------------------------
+# #P opt=(calcfc,ts,noeig) freq ub3lyp/6-31g(d)
+# ---------------------------------------------
+GAUSS_BLOCK_PATTERNS = {
+    'options': ('-' * 5, '-' * 5, 1, 2),
+    'scan': (r'The following ModRedundant input section has been read:', r'^\s$'),
+}
+
+
+def get_gauss_blocks(file_path, keys=None, use_cache=False):
+    """
+    Locate the blocks of a gaussian output within a single pass
+
+    Args:
+        file_path (str): The full file path to the gaussian output file
+        keys (list): The keys of GAUSS_BLOCK_PATTERNS to search. By default,
+                     all of the blocks are searched
+        use_cache (bool): Whether to use the on-disk block index
+
+    Returns:
+        blk_ps (dict): Lists of paired indices of the blocks keyed by the block name
+    """
+    keys = keys or GAUSS_BLOCK_PATTERNS.keys()
+    patterns = {key: GAUSS_BLOCK_PATTERNS[key] for key in keys}
+    if use_cache:
+        return scan_blocks_cached(file_path, patterns)
+    return scan_blocks(file_path, patterns)
+
+
+def parse_gauss_options(file_path, blk_ps=None):
     """
     Parse the gaussian options
 
     Args:
         file_path (str): The full file path to the gaussian output file
+        blk_ps (dict): The blocks located by get_gauss_blocks. If not assigned,
+                       the option block is searched from the file
 
     Returns:
         setting_dict (dict): A dict contains the option parameters
     """
     options = ['iop', 'opt', 'guess', 'irc',
                'scf', 'integral', 'freq', 'cbs-qb3']
-    # The option example:
-    # ---------------------------------------------
-    # #P opt=(calcfc,ts,noeig) freq ub3lyp/6-31g(d)
-    # ---------------------------------------------
-    start_pat = '-' * 5
-    end_pat = '-' * 5
+    if not blk_ps:
+        blk_ps = get_gauss_blocks(file_path, keys=['options'])
     with open(file_path, 'r') as f:
-        start, end = find_blocks(f, start_pat, end_pat,
-                                 regex=False, block_count=2)[1]
+        start, end = blk_ps['options'][1]
         lines = read_block(f, start, end)
     settings = ''
     for line in lines:
@@ -128,13 +156,15 @@ def parse_option_contents(content):
     return content_list
 
 
-def parse_gauss_scan_info(file_path, output=True):
+def parse_gauss_scan_info(file_path, output=True, blk_ps=None):
     """
     Parse the scan info from the Gaussian output
 
     Args:
         file_path (str): The full path of the file
         output (bool): Whether it is an output file
+        blk_ps (dict): The blocks located by get_gauss_blocks. If not assigned,
+                       the scan block is searched from the file
     
     Returns:
         scan_info (dict): A dict contains the scan atomic indexes,
@@ -142,9 +172,10 @@ def parse_gauss_scan_info(file_path, output=True):
     """
     # Parse the gaussian scan info from an output file
     if output:
+        if not blk_ps:
+            blk_ps = get_gauss_blocks(file_path, keys=['scan'])
         with open(file_path, 'r') as f:
-            start, end = find_blocks(
-                f, r'The following ModRedundant input section has been read:', r'^\s$')[0]
+            start, end = blk_ps['scan'][0]
             scan_blk = read_block(f, start, end)
     # Parse from the gaussian input file, to be developed
     else:
@@ -241,20 +272,25 @@ def get_gauss_termination_status(file_path):
             return False
 
 
-def classify_gauss_outputs(gauss_files, only_converged=False):
+def classify_gauss_outputs(gauss_files, only_converged=False, use_cache=False):
     """
     Classify the gaussian output files into single point ('sp'), frequency 
     ('freq') and scan ('scan')
 
     Args:
         gauss_files (list): A list of paths to gaussian output file
+        only_converged (bool): Whether to only include converged jobs
+        use_cache (bool): Whether to use the on-disk block index
 
     Returns:
         classified (dict): A dict indicates the files and some properties
     """
     classified = {'sp': [], 'freq': [], 'scan': []}
     for gauss_file in gauss_files:
-        options = parse_gauss_options(gauss_file)
+        # The option block is near the top of the file, while the scan block
+        # is only searched through the file for scan jobs
+        blk_ps = get_gauss_blocks(gauss_file, keys=['options'], use_cache=use_cache)
+        options = parse_gauss_options(gauss_file, blk_ps=blk_ps)
         job_type = get_gauss_job_type(options)
         converged = get_gauss_termination_status(gauss_file)
         if job_type in ['opt', 'opt+freq', 'composite']:
@@ -271,7 +307,8 @@ def classify_gauss_outputs(gauss_files, only_converged=False):
                                            options['method'][0], freqs))
         if job_type == 'scan':
             if not only_converged or converged:
-                scan_info = parse_gauss_scan_info(gauss_file)
+                blk_ps.update(get_gauss_blocks(gauss_file, keys=['scan'], use_cache=use_cache))
+                scan_info = parse_gauss_scan_info(gauss_file, blk_ps=blk_ps)
                 classified['scan'].append((gauss_file, converged, 
                                            options['method'][0], scan_info))
     return classified
@@ -3,23 +3,45 @@
 The toolbox for kinetic library related tasks
 """
 
+import csv
+import heapq
 import logging
 import os
+import re
+import tempfile
+import time
+from bisect import bisect_right
 from collections import OrderedDict
-from copy import deepcopy
+from functools import lru_cache
+from itertools import combinations
+from io import StringIO
+
+import numpy as np
 
 from rmgpy import settings
-from rmgpy.chemkin import load_chemkin_file
+from rmgpy.chemkin import load_chemkin_file, load_species_dictionary, read_reactions_block
 from rmgpy.data.base import Entry
 from rmgpy.data.kinetics import KineticsLibrary
 from rmgpy.data.kinetics.database import KineticsDatabase
+from rmgpy.exceptions import ChemkinError, DatabaseError
+from rmgpy.reaction import Reaction
 
-from toolbox.reaction import get_kinetic_data
+from toolbox.base import atomic_open, imap_in_pool, read_file_cache, read_libs_by_paths, \
+                         read_yaml_file, write_file_cache
+from toolbox.reaction import ReactionIndex, get_kinetic_data, parse_rxn_labels
+from toolbox.species import write_spc_dict_to_path
 
 ##################################################################
 
 
-def chemkin_to_kinetic_lib(chem_path, dict_path, name, save_path='', use_chemkin_names=True):
+# The species dictionary used to parse CHEMKIN reactions in worker processes
+_chemkin_spc_dict = {}
+# The index line of an entry written by KineticsLibrary.save_entry
+ENTRY_INDEX = re.compile(r'^(\s*index = )-?\d+', re.MULTILINE)
+
+
+def chemkin_to_kinetic_lib(chem_path, dict_path, name, save_path='', use_chemkin_names=True,
+                           stream=False, chunk_size=500, processes=None):
     """
     Convert a CHEMKIN file into a RMG kinetic library given species dictionary
     and the library name.
@@ -30,8 +52,23 @@ def chemkin_to_kinetic_lib(chem_path, dict_path, name, save_path='', use_chemkin
         name (str): The name of the new library
         save_path (str): The path to the saving directory. By default, the library
                          will be saved to RMG-database repository
-        use_chemkin_names (bool): Use the original CHEMKIN species name
+        use_chemkin_names (bool): Use the original CHEMKIN species name. Must be
+                                  True in the streaming mode
+        stream (bool): Convert the reactions chunk by chunk in a process pool
+                       and write the library incrementally. See
+                       stream_chemkin_to_kinetic_lib
+        chunk_size (int): The number of reactions in a chunk in the streaming mode
+        processes (int): The number of processes in the streaming mode
     """
+    if stream:
+        if not use_chemkin_names:
+            logging.error('The streaming mode only supports the original CHEMKIN '
+                          'species names (use_chemkin_names=True).')
+            return
+        return stream_chemkin_to_kinetic_lib(chem_path, dict_path, name,
+                                             save_path=save_path,
+                                             chunk_size=chunk_size,
+                                             processes=processes)
     # Load the reactions from the CHEMKIN FILE
     logging.info('Loading CHEMKIN file %s with species dictionary %s'
                  %(chem_path, dict_path))
@@ -41,37 +78,394 @@ def chemkin_to_kinetic_lib(chem_path, dict_path, name, save_path='', use_chemkin
     kinetic_lib.entries = {}
     # Create new entries
     for i in range(len(rxns)):
-        rxn = rxns[i]
-        entry = Entry(
-            index=i + 1,
-            label=str(rxn),
-            item=rxn,
-            data=rxn.kinetics,
-        )
-        try:
-            entry.long_desc = 'Originally from reaction library: ' + \
-                rxn.library + "\n" + rxn.kinetics.comment
-        except AttributeError:
-            entry.long_desc = rxn.kinetics.comment
+        entry = create_chemkin_entry(i + 1, rxns[i])
         kinetic_lib.entries[i + 1] = entry
         logging.info('Adding reaction %s in to the kinetic library %s' %(entry.label, name))
     # Check for duplicates and convert them to multiArrhenius / multiPdepArrehenius
-    kinetic_lib.check_for_duplicates(mark_duplicates=True)
+    check_for_duplicates(kinetic_lib, mark_duplicates=True)
     kinetic_lib.convert_duplicates_to_multi()
     # Save the library
+    save_path = _get_kinetic_lib_dir(name, save_path)
+    logging.info('Saving the kinetic library to %s' %(save_path))
+    kinetic_lib.save(os.path.join(save_path, 'reactions.py'))
+    kinetic_lib.save_dictionary(os.path.join(save_path, 'dictionary.txt'))
+
+
+def stream_chemkin_to_kinetic_lib(chem_path, dict_path, name, save_path='',
+                                  chunk_size=500, processes=None, log_interval=10.0):
+    """
+    Convert a CHEMKIN file into a RMG kinetic library chunk by chunk, which
+    results in the same library as chemkin_to_kinetic_lib. The reactions are
+    read in chunks and converted to library entries in a process pool, and the
+    texts of the entries are spooled to a temporary file in the original order,
+    so that the whole mechanism is never held in memory. Only the species
+    labels of the reactions are kept to find duplicate reactions across chunks.
+    Reactions marked as DUPLICATE and the reactions found duplicate of other
+    reactions are converted again together at the end, where they are checked,
+    marked and combined into multi kinetics, and written back in place. The
+    species used by the entries are saved along with the library. The library
+    file is only replaced if the whole conversion succeeds.
+
+    Args:
+        chem_path (str): The path to the CHEMKIN file
+        dict_path (str): The path to a species dictionary
+        name (str): The name of the new library
+        save_path (str): The path to the saving directory. By default, the library
+                         will be saved to RMG-database repository
+        chunk_size (int): The number of reactions in a chunk
+        processes (int): The number of processes. Run in the current process if 1
+        log_interval (float): The minimum interval in seconds between progress logs
+
+    Returns:
+        count (int): The number of entries in the library
+
+    Raises:
+        ChemkinError: If a chunk of reactions fails to be converted, or unmarked
+                      duplicate reactions are found
+    """
+    save_path = _get_kinetic_lib_dir(name, save_path)
+    lib_path = os.path.join(save_path, 'reactions.py')
+    logging.info('Converting CHEMKIN file %s with species dictionary %s to %s'
+                 % (chem_path, dict_path, save_path))
+    kinetic_lib = KineticsLibrary(name=name)
+    kinetic_lib.entries = {}
+    units, duplicates, rxn_keys, keys, lengths = '', [], {}, [], []
+
+    def get_chunks():
+        nonlocal units
+        for units, entries in iter_chemkin_reaction_chunks(chem_path, chunk_size, duplicates):
+            if entries:
+                yield ([position for position, _ in entries],
+                       units + ''.join(text for _, text in entries) + 'END\n')
+
+    start_time = time.time()
+    log_time = start_time
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Write the header of the library by saving it without entries
+        kinetic_lib.save(os.path.join(tmp_dir, 'reactions.py'))
+        with open(os.path.join(tmp_dir, 'reactions.py'), 'r') as f:
+            header = f.read()
+        with open(os.path.join(tmp_dir, 'entries.py'), 'w+') as spool:
+            for entries in imap_in_pool(_convert_chemkin_chunk, get_chunks(),
+                                        processes=processes,
+                                        initializer=_load_chemkin_spc_dict,
+                                        initargs=(dict_path,)):
+                for rxn_key, text in entries:
+                    _add_chemkin_rxn_key(rxn_keys, rxn_key)
+                    keys.append(rxn_key)
+                    spool.write(text)
+                    lengths.append(len(text))
+                if time.time() - log_time > log_interval:
+                    log_time = time.time()
+                    logging.info('%d reactions converted (%.1f reactions/s)'
+                                 % (len(keys), len(keys) / (log_time - start_time)))
+            spc_dict = load_species_dictionary(dict_path)
+            dup_rxns = _read_chemkin_duplicates(units, duplicates, spc_dict)
+            # The entries are indexed in the order of the reactions after combining
+            # the marked duplicates, as read by load_chemkin_file
+            positions = [rxn_key[0] for rxn_key in keys]
+            order = list(heapq.merge(positions, dup_rxns))
+            replaced, dup_entries = _convert_chemkin_duplicates(
+                chem_path, units, dup_rxns, rxn_keys, spc_dict, order, chunk_size=chunk_size)
+            # Assemble the library, with the entries converted again in place
+            spool.seek(0)
+            count, spc_labels = 0, OrderedDict()
+            normal_entries = zip(keys, lengths)
+            with atomic_open(lib_path) as f:
+                f.write(header)
+                for index, position in enumerate(order, 1):
+                    if position not in dup_rxns:
+                        rxn_key, length = next(normal_entries)
+                        text = spool.read(length)
+                        if position not in replaced:
+                            f.write(ENTRY_INDEX.sub(r'\g<1>%d' % index, text, count=1))
+                            spc_labels.update(dict.fromkeys(rxn_key[1] + rxn_key[2]))
+                            count += 1
+                            continue
+                    # Entries merged into multi kinetics are removed
+                    entry = dup_entries.get(index)
+                    if entry is not None:
+                        kinetic_lib.save_entry(f, entry)
+                        spc_labels.update(dict.fromkeys(
+                            spc.label for spc in entry.item.reactants + entry.item.products))
+                        count += 1
+    # Only the species used by the entries are saved, as save_dictionary
+    write_spc_dict_to_path(OrderedDict((label, spc_dict[label]) for label in spc_labels),
+                           os.path.join(save_path, 'dictionary.txt'))
+    logging.info('%d reactions are converted into %d entries in %.1f s, %d of them '
+                 'marked as duplicate in the CHEMKIN file.'
+                 % (len(keys) + len(duplicates), count, time.time() - start_time,
+                    len(duplicates)))
+    return count
+
+
+def iter_chemkin_reaction_chunks(chem_path, chunk_size=500, duplicates=None):
+    """
+    Read the reactions block of a CHEMKIN file in chunks. Each reaction entry
+    includes its equation line, the following auxiliary lines and the
+    comment lines preceding it.
+
+    Args:
+        chem_path (str): The path to the CHEMKIN file
+        chunk_size (int): The number of reactions in a chunk
+        duplicates (list): If provided, the entries marked as DUPLICATE are
+                           appended to it instead of being yielded in chunks
+
+    Yields:
+        units (str): The REACTIONS line with the units
+        entries (list): The position (starting from 1) in the file and the text
+                        of each reaction entry in the chunk
+    """
+    with open(chem_path, 'r') as f:
+        for units in f:
+            if units.strip().upper().startswith('REAC'):
+                break
+        else:
+            logging.error('No reactions block is found in %s' % chem_path)
+            return
+        entries, entry, comments, position = [], [], [], 0
+        for line in f:
+            content = line.split('!')[0].strip()
+            if content.upper().startswith('END'):
+                break
+            elif not content:
+                comments.append(line)
+                continue
+            elif '=' in content:
+                # A new reaction, the comments ahead belongs to it
+                if entry:
+                    position += 1
+                    _add_chemkin_entry(position, entry, entries, duplicates)
+                entry, comments = comments + [line], []
+                if len(entries) >= chunk_size:
+                    yield units, entries
+                    entries = []
+            else:
+                entry.extend(comments + [line])
+                comments = []
+        if entry:
+            _add_chemkin_entry(position + 1, entry + comments, entries, duplicates)
+        # The last chunk is yielded even if empty, so that the units are
+        # available to the duplicates
+        yield units, entries
+
+
+def _add_chemkin_entry(position, entry, entries, duplicates=None):
+    """
+    Add the position and the text of a CHEMKIN reaction entry to the entries,
+    or the duplicates if it is marked as DUPLICATE and the duplicates is provided
+    """
+    text = ''.join(entry)
+    if duplicates is not None and \
+            any(line.split('!')[0].strip().upper().startswith('DUP') for line in entry):
+        duplicates.append((position, text))
+    else:
+        entries.append((position, text))
+
+
+def _load_chemkin_spc_dict(dict_path):
+    """
+    Load the species dictionary to parse CHEMKIN reactions in the process
+    """
+    _chemkin_spc_dict.clear()
+    _chemkin_spc_dict.update(load_species_dictionary(dict_path))
+
+
+def _read_chemkin_reactions(units, entries, spc_dict):
+    """
+    Read the reactions from the texts of CHEMKIN reaction entries
+    """
+    if not entries:
+        return []
+    return read_reactions_block(StringIO(units + ''.join(entries) + 'END\n'),
+                                spc_dict, read_comments=True)
+
+
+def _convert_chemkin_chunk(chunk):
+    """
+    Convert a chunk of CHEMKIN reactions into the text of library entries
+
+    Args:
+        chunk (tuple): The positions of the reactions in the file, and the text
+                       of the reactions block
+
+    Returns:
+        entries (list): The key of the reaction (see _get_chemkin_rxn_key)
+                        and the text of each entry, indexed by its position
+
+    Raises:
+        ChemkinError: If the chunk fails to be converted
+    """
+    positions, text = chunk
+    try:
+        rxns = read_reactions_block(StringIO(text), _chemkin_spc_dict, read_comments=True)
+    except Exception as e:
+        raise ChemkinError('Failed to convert the chunk of reactions starting at'
+                           ' position %d: %s' % (positions[0], e))
+    kinetic_lib = KineticsLibrary()
+    entries = []
+    for position, rxn in zip(positions, rxns):
+        f = StringIO()
+        kinetic_lib.save_entry(f, create_chemkin_entry(position, rxn))
+        entries.append((_get_chemkin_rxn_key(position, rxn), f.getvalue()))
+    return entries
+
+
+def _get_chemkin_rxn_key(position, rxn):
+    """
+    Get the position, the reactant labels, the product labels and the pressure
+    dependence of a reaction to find its duplicates
+    """
+    return (position,
+            tuple(spc.label for spc in rxn.reactants),
+            tuple(spc.label for spc in rxn.products),
+            rxn.kinetics.is_pressure_dependent())
+
+
+def _add_chemkin_rxn_key(rxn_keys, rxn_key):
+    """
+    Add the key of a reaction to the keys grouped by the reactants and products
+    regardless of their orders and the direction
+    """
+    group = tuple(sorted([tuple(sorted(rxn_key[1])), tuple(sorted(rxn_key[2]))]))
+    rxn_keys.setdefault(group, []).append(rxn_key)
+
+
+def _read_chemkin_duplicates(units, duplicates, spc_dict):
+    """
+    Read the CHEMKIN reactions marked as DUPLICATE, where the duplicates are
+    combined into multi kinetics by read_reactions_block
+
+    Args:
+        units (str): The REACTIONS line with the units
+        duplicates (list): The positions and the texts of the reaction entries
+        spc_dict (dict): The species dictionary
+
+    Returns:
+        dup_rxns (OrderedDict): The combined reactions by the positions of
+                                their first duplicates
+    """
+    rxns = _read_chemkin_reactions(units, [text for _, text in duplicates], spc_dict)
+    # Each combined reaction takes the place of its first duplicate, which is
+    # matched by reading the entries one by one
+    dup_rxns, rxn_iter = OrderedDict(), iter(rxns)
+    rxn = next(rxn_iter, None)
+    for position, text in duplicates:
+        single = _read_chemkin_reactions(units, [text], spc_dict)[0]
+        if rxn is not None and _get_chemkin_rxn_key(0, rxn) == _get_chemkin_rxn_key(0, single):
+            dup_rxns[position] = rxn
+            rxn = next(rxn_iter, None)
+    if rxn is not None:
+        raise ChemkinError('Failed to locate the combined duplicate reaction {0}.'.format(rxn))
+    return dup_rxns
+
+
+def _convert_chemkin_duplicates(chem_path, units, dup_rxns, rxn_keys, spc_dict, order,
+                                chunk_size=500):
+    """
+    Convert the combined CHEMKIN reactions marked as DUPLICATE, together with
+    the converted reactions found duplicate of other reactions, into entries.
+    The entries are checked, marked and combined into multi kinetics as in
+    chemkin_to_kinetic_lib.
+
+    Args:
+        chem_path (str): The path to the CHEMKIN file
+        units (str): The REACTIONS line with the units
+        dup_rxns (OrderedDict): The combined duplicate reactions by their positions
+        rxn_keys (dict): The keys of the converted reactions grouped by
+                         _add_chemkin_rxn_key, updated with the duplicates
+        spc_dict (dict): The species dictionary
+        order (list): The sorted positions of the reactions, including the
+                      duplicates, whose ranks are the indices of the entries
+        chunk_size (int): The number of reactions in a chunk used in the conversion
+
+    Returns:
+        replaced (set): The positions of the converted reactions to be replaced
+        entries (dict): The new entries by their indices
+
+    Raises:
+        ChemkinError: If unmarked duplicate reactions are found
+    """
+    for position, rxn in dup_rxns.items():
+        _add_chemkin_rxn_key(rxn_keys, _get_chemkin_rxn_key(position, rxn))
+    replaced = set()
+    for group in rxn_keys.values():
+        if len(group) == 1:
+            continue
+        for key1, key2 in combinations(group, 2):
+            # Same as read_reactions_block, identical reactions must be both marked
+            # unless only one of them is pressure dependent
+            if (key1[0] not in dup_rxns or key2[0] not in dup_rxns) and key1[1:] == key2[1:]:
+                raise ChemkinError('Encountered unmarked duplicate reaction {0}.'.format(
+                    ' + '.join(key1[1]) + ' <=> ' + ' + '.join(key1[2])))
+        replaced.update(key[0] for key in group if key[0] not in dup_rxns)
+    # Read the entries to be replaced again from the CHEMKIN file
+    entries = []
+    if replaced:
+        for _, chunk in iter_chemkin_reaction_chunks(chem_path, chunk_size, []):
+            entries.extend((position, text) for position, text in chunk if position in replaced)
+    rxns = zip([position for position, _ in entries],
+               _read_chemkin_reactions(units, [text for _, text in entries], spc_dict))
+    # Indexed and ordered as in the whole library
+    rxns = sorted(list(rxns) + list(dup_rxns.items()), key=lambda item: item[0])
+    kinetic_lib = KineticsLibrary()
+    kinetic_lib.entries = OrderedDict()
+    for position, rxn in rxns:
+        index = bisect_right(order, position)
+        kinetic_lib.entries[index] = create_chemkin_entry(index, rxn)
+    if kinetic_lib.entries:
+        check_for_duplicates(kinetic_lib, mark_duplicates=True)
+        kinetic_lib.convert_duplicates_to_multi()
+    return replaced, kinetic_lib.entries
+
+
+def create_chemkin_entry(index, rxn):
+    """
+    Create a kinetic library entry from a reaction read from a CHEMKIN file
+
+    Args:
+        index (int): The index of the new entry
+        rxn (RMG Reaction): The reaction
+
+    Returns:
+        entry (RMG Entry): The created RMG kinetic entry
+    """
+    entry = Entry(
+        index=index,
+        label=str(rxn),
+        item=rxn,
+        data=rxn.kinetics,
+    )
+    try:
+        entry.long_desc = 'Originally from reaction library: ' + \
+            rxn.library + "\n" + rxn.kinetics.comment
+    except (AttributeError, TypeError):
+        entry.long_desc = rxn.kinetics.comment
+    return entry
+
+
+def _get_kinetic_lib_dir(name, save_path=''):
+    """
+    Get the directory of a kinetic library and create it if not existing
+
+    Args:
+        name (str): The name of the library
+        save_path (str): The path to the saving directory. By default, the
+                         RMG-database repository
+
+    Returns:
+        (str): The directory of the library
+    """
     if not save_path:
         save_path = os.path.join(settings['database.directory'], 'kinetics',
                                  'libraries')
-    try:
-        os.makedirs(os.path.join(save_path, name))
-    except:
-        pass
-    logging.info('Saving the kinetic library to %s' %(os.path.join(save_path, name)))
-    kinetic_lib.save(os.path.join(save_path, name, 'reactions.py'))
-    kinetic_lib.save_dictionary(os.path.join(save_path, name, 'dictionary.txt'))
+    lib_dir = os.path.join(save_path, name)
+    os.makedirs(lib_dir, exist_ok=True)
+    return lib_dir
 
 
-def read_kinetic_lib_from_path(lib_path, kinetic_db, overwrite=False, create=False):
+def read_kinetic_lib_from_path(lib_path, kinetic_db, overwrite=False, create=False,
+                               use_cache=True):
     """
     Read RMG kinetic library given its file path. The species dictionary should
     be included under the same directory.
@@ -79,6 +473,7 @@ def read_kinetic_lib_from_path(lib_path, kinetic_db, overwrite=False, create=Fal
     Args:
         lib_path (str): Path to thermo library file
         kinetic_db (RMG KineticsDatabase): RMG  database object
+        use_cache (bool): Use the cached library if the library files are unchanged
     """
     if not os.path.exists(lib_path) and create:
         create_kinetic_lib(os.path.dirname(lib_path))
@@ -88,22 +483,126 @@ def read_kinetic_lib_from_path(lib_path, kinetic_db, overwrite=False, create=Fal
         logging.info('Created kinetics library {1} at {0} ...'.format(
             os.path.split(lib_path)[0], os.path.split(lib_path)[1]),)
     elif lib_path not in kinetic_db.library_order or overwrite:
-        lib = KineticsLibrary()
-        try:
-            lib.load(lib_path, KineticsDatabase().local_context,
-                     KineticsDatabase().global_context)
-        except:
+        lib = load_kinetic_lib(lib_path, use_cache=use_cache)
+        if lib is None:
             logging.error('The library file %s is not vaild.' % (lib_path))
         else:
             lib.label = lib_path
             kinetic_db.libraries[lib.label] = lib
-            kinetic_db.library_order.append(lib.label)
+            if lib.label not in kinetic_db.library_order:
+                kinetic_db.library_order.append(lib.label)
             logging.info('Loading kinetics library {1} from {0} ...'.format(
                 os.path.split(lib_path)[0], os.path.split(lib_path)[1]),)
     else:
         logging.warning('The library %s has already been loaded' % (lib_path))
 
 
+def read_kinetic_libs_from_paths(lib_paths, kinetic_db, overwrite=False, use_cache=True,
+                                 processes=None):
+    """
+    Read RMG kinetic libraries given their file paths. The libraries are loaded
+    in a process pool and added to the database in the order of the paths.
+
+    Args:
+        lib_paths (list): Paths to kinetic library files
+        kinetic_db (RMG KineticsDatabase): RMG  database object
+        overwrite (bool): Reload the libraries already in the database
+        use_cache (bool): Use the cached libraries if the library files are unchanged
+        processes (int): The number of processes. Run in the current process if 1
+
+    Returns:
+        report (dict): The loaded libraries with their loading times in seconds,
+                       the failed libraries, and the skipped libraries
+    """
+    return read_libs_by_paths(load_kinetic_lib, lib_paths, kinetic_db, kind='kinetics',
+                              overwrite=overwrite, use_cache=use_cache, processes=processes)
+
+
+def load_kinetic_lib(lib_path, use_cache=True):
+    """
+    Load a RMG kinetic library from its file path. The loaded library is cached
+    under CACHE_DIR, and it is read from the cache next time if the library
+    file and the species dictionary are unchanged.
+
+    Args:
+        lib_path (str): Path to kinetic library file
+        use_cache (bool): Use and update the cache
+
+    Returns:
+        lib (RMG KineticsLibrary): The library. None if the library is not valid
+    """
+    paths = [lib_path]
+    dict_path = os.path.join(os.path.dirname(lib_path), 'dictionary.txt')
+    if os.path.isfile(dict_path):
+        paths.append(dict_path)
+    if use_cache:
+        lib = read_file_cache('kinetics_libraries', paths)
+        if lib is not None:
+            return lib
+    lib = KineticsLibrary()
+    try:
+        lib.load(lib_path, *get_kinetics_contexts())
+    except Exception as e:
+        logging.debug('Failed to load the library file %s (%s).' % (lib_path, e))
+        return
+    if use_cache:
+        write_file_cache(lib, 'kinetics_libraries', paths)
+    return lib
+
+
+@lru_cache(maxsize=1)
+def get_kinetics_contexts():
+    """
+    Get the local and global contexts to load kinetic libraries, which
+    are created once and shared
+
+    Returns:
+        (tuple): The local context and the global context
+    """
+    kinetic_db = KineticsDatabase()
+    return kinetic_db.local_context, kinetic_db.global_context
+
+
+def check_for_duplicates(library, mark_duplicates=False):
+    """
+    Check for the duplicate reactions in a kinetics library, the same as
+    KineticsLibrary.check_for_duplicates but only comparing the reactions with
+    the same species structures. The duplicate reactions in a library must
+    be marked as duplicate.
+
+    Args:
+        library (RMG KineticsLibrary): The library to be checked
+        mark_duplicates (bool): Mark the unmarked duplicate reactions instead
+                                of raising DatabaseError
+
+    Returns:
+        duplicates (list): The pairs of the indexes of the duplicate entries
+
+    Raises:
+        DatabaseError: If any duplicate reactions are not marked and mark_duplicates is False
+    """
+    rxn_index = ReactionIndex()
+    for entry in library.entries.values():
+        rxn_index.add(entry.item, entry)
+    duplicates = []
+    for entry0 in library.entries.values():
+        for entry in rxn_index.iter_matches(entry0.item):
+            if entry0.index > entry.index:
+                # Each pair is only checked once
+                continue
+            duplicates.append((entry0.index, entry.index))
+            if entry0.item.duplicate and entry.item.duplicate:
+                continue
+            if not mark_duplicates:
+                raise DatabaseError('Unexpected duplicate reaction {0} in kinetics library {1}. '
+                                    'Reaction index {2} matches index {3}.'.format(
+                                        entry0.item, library.label, entry.index, entry0.index))
+            entry0.item.duplicate = entry.item.duplicate = True
+            logging.warning('Reaction indices {0} and {1} were marked as duplicate.'.format(
+                entry0.index, entry.index))
+    return duplicates
+
+
 def create_kinetic_lib(path):
     """
     Create an empty kinetic library and an empty species dictionary according to the path
@@ -121,6 +620,7 @@ def create_kinetic_lib(path):
     with open(dict_path, 'w+'):
         pass
 
+
 def create_kinetics_entry(label, rxn, index, k_data, settings):
     """
     Create a kinetic library entry given its label, corresponding reaction,
@@ -165,12 +665,248 @@ def remove_kinetic_entries_from_lib(label_list, library):
                           entries to be removed
         library (RMG KineticsLibrary): The library to be removed from
     """
+    remove_kinetic_entries(library, labels=label_list)
+
+
+def remove_kinetic_entries(library, labels=None, indices=None, predicate=None):
+    """
+    Remove entries from a RMG kinetics library by their labels, their indexes,
+    or a predicate. The remaining entries are kept in order and reindexed
+    starting from 0.
+
+    Args:
+        library (RMG KineticsLibrary): The library to be removed from
+        labels (list): The labels of the entries to be removed
+        indices (list): The indexes of the entries to be removed
+        predicate (function): A function takes an entry as input and returns
+                              True if the entry is to be removed
+
+    Returns:
+        report (dict): The removed entries (list of the original indexes and labels),
+                       the number of the remaining entries, and the map from
+                       the original indexes to the new indexes
+    """
+    labels = set(labels or [])
+    indices = set(indices or [])
     new_entries = OrderedDict()
+    report = {'removed': [], 'kept': 0, 'index_map': {}}
     for entry in library.entries.values():
-        if entry.label not in label_list:
-            index = len(new_entries)
-            new_entries[index] = deepcopy(entry)
-            new_entries[index].index = index
-        else:
-            logging.warn('Removing entry {0}'.format(entry.item))
-        library.entries = new_entries
+        if entry.label in labels or entry.index in indices \
+                or (predicate and predicate(entry)):
+            report['removed'].append((entry.index, entry.label))
+            logging.debug('Removing entry {0}'.format(entry.item))
+            continue
+        index = len(new_entries)
+        report['index_map'][entry.index] = index
+        entry.index = index
+        new_entries[index] = entry
+    library.entries = new_entries
+    report['kept'] = len(new_entries)
+    if report['removed']:
+        logging.warn('Removed {0} entries: {1}'.format(
+            len(report['removed']), ', '.join(label for _, label in report['removed'])))
+    return report
+
+
+# The columns of kinetics tables read as kinetic parameters,
+# the other columns update the settings of the row. The uncertainty
+# column is not supported, since RMG needs a RateUncertainty object
+KINETICS_TABLE_PARAMS = ('label', 'type', 'A', 'n', 'Ea', 'T0', 'P',
+                         'multiplier', 'uncertainty')
+
+
+def read_kinetics_table(table_path):
+    """
+    Read a table of kinetic parameters from a CSV file or a YAML file
+    of a list of rows. Each row has the reaction label, the kinetics type
+    (Arrhenius, MultiArrhenius or PdepArrhenius), and the kinetic parameters
+    A, n, Ea, T0, P and multiplier. MultiArrhenius and
+    PdepArrhenius kinetics take one row per Arrhenius expression, with the
+    same reaction label. Other columns (e.g., units, Tmin, comment)
+    override the settings for the row.
+
+    Args:
+        table_path (str): The path to the table file
+
+    Returns:
+        rows (list): A list of dictionaries of the rows
+    """
+    if os.path.splitext(table_path)[1] in ['.yml', '.yaml']:
+        rows = read_yaml_file(table_path) or []
+    else:
+        with open(table_path, 'r', newline='') as f:
+            rows = [{key.strip(): _parse_table_value(value)
+                     for key, value in row.items() if key}
+                    for row in csv.DictReader(f)]
+    return rows
+
+
+def _parse_table_value(value):
+    """
+    Convert a value in a CSV table to a number if possible
+
+    Args:
+        value (str): The value
+
+    Returns:
+        The number, the stripped string, or None if empty
+    """
+    value = value.strip() if value else ''
+    if not value:
+        return
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def validate_kinetics_table(rows):
+    """
+    Validate the kinetic parameters of the rows of a kinetics table
+
+    Args:
+        rows (list): A list of dictionaries of the rows
+
+    Returns:
+        valid (np.array): A boolean array indicating if each row is valid
+    """
+    def column(key, default=np.nan):
+        values = [row.get(key) for row in rows]
+        try:
+            return np.array([default if value is None else value
+                             for value in values], dtype=float)
+        except (TypeError, ValueError):
+            # Check value by value if any value is not a number
+            return np.array([_to_float(value, default) for value in values])
+    is_pdep = np.array([row.get('type') == 'PdepArrhenius' for row in rows], dtype=bool)
+    valid = np.isfinite(column('A')) & np.isfinite(column('n')) \
+            & np.isfinite(column('Ea')) & (column('T0', 1.0) > 0) \
+            & (column('multiplier', 1.0) > 0) \
+            & (~is_pdep | (column('P') > 0))
+    valid &= np.array([bool(row.get('label')) and (row.get('type') or 'Arrhenius')
+                       in ['Arrhenius', 'MultiArrhenius', 'PdepArrhenius']
+                       for row in rows], dtype=bool)
+    for row, is_valid in zip(rows, valid):
+        if not is_valid:
+            logging.error('The kinetics of %s is not valid: %s' % (row.get('label'), row))
+    return valid
+
+
+def _to_float(value, default=np.nan):
+    """
+    Convert a value to float, or nan if not a number
+    """
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def get_k_data_from_rows(rows):
+    """
+    Convert the rows of a reaction in a kinetics table to k_data
+
+    Args:
+        rows (list): A list of dictionaries of the rows of the same reaction
+
+    Returns:
+        k_data (dict): A dictionary contains the information about
+                       A factor, n, Ea, T0 and multiplier. None if not valid
+    """
+    k_type = rows[0].get('type') or 'Arrhenius'
+    if any((row.get('type') or 'Arrhenius') != k_type for row in rows) \
+            or (k_type == 'Arrhenius' and len(rows) > 1):
+        logging.error('Rows of %s have inconsistent kinetics types.' % rows[0]['label'])
+        return
+    params = {'active': True}
+    if k_type == 'Arrhenius':
+        params.update({key: rows[0].get(key) for key in ['A', 'n', 'Ea', 'T0']})
+    else:
+        for key in ['A', 'n', 'Ea']:
+            params[key] = [row[key] for row in rows]
+        if rows[0].get('T0'):
+            params['T0'] = rows[0]['T0']
+        if k_type == 'PdepArrhenius':
+            params['P'] = [row['P'] for row in rows]
+    params['multiplier'] = rows[0].get('multiplier')
+    return {k_type: params}
+
+
+def add_kinetics_entries_from_table(table_path, library, spc_dict, settings,
+                                    lib_path='', dict_path='', resonance=True,
+                                    skip_duplicates=True):
+    """
+    Create kinetic library entries from a table of kinetic parameters and
+    add them to the library. See read_kinetics_table for the table format.
+
+    Args:
+        table_path (str): The path to the table file
+        library (RMG KineticsLibrary): The library to be added to
+        spc_dict (OrderedDict): an ordered dictionary has all species information
+        settings (dict): A dictionary contains the information about
+                         variable units, T and P range, description
+        lib_path (str): The path to save the library. Not saved if not provided
+        dict_path (str): The path to save the species dictionary. Not saved if not provided
+        resonance (bool): if generate resonance structure for reactants and product
+        skip_duplicates (bool): Skip the reactions already in the library
+
+    Returns:
+        report (dict): The labels of the reactions added, the invalid reactions,
+                       and the duplicate reactions
+    """
+    rows = read_kinetics_table(table_path)
+    report = {'added': [], 'invalid': [], 'duplicate': []}
+    # Group the valid rows by reaction labels
+    groups = OrderedDict()
+    for row, is_valid in zip(rows, validate_kinetics_table(rows)):
+        label = row.get('label')
+        if not is_valid or label in report['invalid']:
+            groups.pop(label, None)
+            if label not in report['invalid']:
+                report['invalid'].append(label)
+            continue
+        groups.setdefault(label, []).append(row)
+    if any(row.get('uncertainty') is not None for rows in groups.values() for row in rows):
+        logging.warning('The uncertainty column is not supported and ignored.')
+    rxns = parse_rxn_labels(list(groups), spc_dict, resonance=resonance)
+    rxn_index = ReactionIndex()
+    for entry in library.entries.values():
+        rxn_index.add(entry.item)
+    index = max((entry.index for entry in library.entries.values()), default=0) + 1
+    # Libraries loaded from files key the entries by "index:label"
+    str_keys = any(isinstance(key, str) for key in library.entries)
+    for label, label_rows in groups.items():
+        k_data = get_k_data_from_rows(label_rows)
+        if rxns[label] is None or k_data is None:
+            report['invalid'].append(label)
+            continue
+        rxn = Reaction(reactants=rxns[label][0], products=rxns[label][1])
+        if skip_duplicates and rxn_index.find(rxn) is not None:
+            logging.warn('The reaction %s is already in the library. Skipped.' % label)
+            report['duplicate'].append(label)
+            continue
+        row_settings = dict(settings)
+        row_settings.update({key: value for key, value in label_rows[0].items()
+                             if key not in KINETICS_TABLE_PARAMS and value is not None})
+        try:
+            entry = create_kinetics_entry(label, rxn, index, k_data, row_settings)
+        except Exception as e:
+            logging.error('Failed to create the entry of %s: %s' % (label, e))
+            entry = None
+        if entry is None or entry.data is None:
+            report['invalid'].append(label)
+            continue
+        library.entries['{0:d}:{1}'.format(index, label) if str_keys else index] = entry
+        rxn_index.add(rxn)
+        report['added'].append(label)
+        index += 1
+    logging.info('%d reactions are added from %s, %d invalid, %d duplicate.'
+                 % (len(report['added']), table_path, len(report['invalid']),
+                    len(report['duplicate'])))
+    if lib_path:
+        library.save(lib_path)
+    if dict_path:
+        write_spc_dict_to_path(spc_dict, dict_path)
+    return report
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+The toolbox for evaluating rate coefficients of kinetics in batch
+"""
+
+import logging
+
+import numpy as np
+
+from rmgpy.constants import R
+from rmgpy.kinetics.arrhenius import Arrhenius, MultiArrhenius, PDepArrhenius, MultiPDepArrhenius
+
+##################################################################
+
+class PackedKinetics(object):
+    """
+    The Arrhenius parameters of a list of kinetics packed into arrays, so that
+    the rate coefficients of all kinetics can be evaluated at a grid of
+    temperatures and pressures at once. Every modified Arrhenius expression
+    is a term. The terms are summed into rows, where a row is either the
+    rate coefficient of an Arrhenius or MultiArrhenius kinetics, or the rate
+    coefficient at one pressure of a PDepArrhenius kinetics. The rate
+    coefficients of PDepArrhenius kinetics are interpolated linearly
+    in log(P) and log(k) between the rows, and clamped to the pressure range.
+    Kinetics of other types are evaluated by their get_rate_coefficient.
+
+    Attributes:
+        labels (list): The labels of the kinetics
+        A (np.array): The pre-exponential factors of the terms in SI units
+        n (np.array): The temperature exponents of the terms
+        Ea (np.array): The activation energies of the terms in J/mol
+        T0 (np.array): The reference temperatures of the terms in K
+        rows (np.array): The row indexes of the terms
+    """
+
+    def __init__(self, kinetics, labels=None):
+        """
+        Args:
+            kinetics (list): A list of RMG kinetics
+            labels (list): The labels of the kinetics, indexes by default
+        """
+        self.labels = list(labels) if labels is not None else list(range(len(kinetics)))
+        if len(self.labels) != len(kinetics):
+            raise ValueError('The numbers of labels and kinetics are different.')
+        self.size = len(kinetics)
+        # The first `size` rows are reserved for pressure independent kinetics
+        self.row_num = self.size
+        terms, rows = [], []
+        # Each pressure dependent kinetics (or its component) is a group
+        # with its pressures and the rows at the pressures
+        self.groups = []
+        self.fallback = {}
+        for index, kin in enumerate(kinetics):
+            if isinstance(kin, MultiPDepArrhenius):
+                components = kin.arrhenius
+            elif isinstance(kin, PDepArrhenius):
+                components = [kin]
+            else:
+                arrhs = _get_arrhenius_terms(kin)
+                if arrhs is None:
+                    self.fallback[index] = kin
+                else:
+                    terms.extend(arrhs)
+                    rows.extend([index] * len(arrhs))
+                continue
+            levels = [[_get_arrhenius_terms(arrh) for arrh in comp.arrhenius]
+                      if isinstance(comp, PDepArrhenius) else [None]
+                      for comp in components]
+            if any(arrhs is None for comp_levels in levels for arrhs in comp_levels):
+                self.fallback[index] = kin
+                continue
+            for comp, comp_levels in zip(components, levels):
+                level_rows = []
+                for arrhs in comp_levels:
+                    terms.extend(arrhs)
+                    rows.extend([self.row_num] * len(arrhs))
+                    level_rows.append(self.row_num)
+                    self.row_num += 1
+                self.groups.append((index, np.log(comp.pressures.value_si),
+                                    np.array(level_rows)))
+        self.A = np.array([arrh.A.value_si for arrh in terms], dtype=float)
+        self.n = np.array([arrh.n.value_si for arrh in terms], dtype=float)
+        self.Ea = np.array([arrh.Ea.value_si for arrh in terms], dtype=float)
+        self.T0 = np.array([arrh.T0.value_si for arrh in terms], dtype=float)
+        self.rows = np.array(rows, dtype=int)
+        if self.fallback:
+            logging.info('%d kinetics are not supported and evaluated one by one.'
+                         % len(self.fallback))
+
+    @classmethod
+    def from_library(cls, library):
+        """
+        Pack the kinetics of the entries in a kinetics library
+
+        Args:
+            library (KineticsLibrary): The kinetics library
+
+        Returns:
+            (PackedKinetics): The packed kinetics labeled by the entry labels
+        """
+        entries = list(library.entries.values())
+        return cls([entry.data for entry in entries],
+                   labels=[entry.label for entry in entries])
+
+    def get_rate_coefficients(self, T_list, P_list=None):
+        """
+        Evaluate the rate coefficients of all kinetics
+
+        Args:
+            T_list (array_like): The temperatures in K
+            P_list (array_like): The pressures in Pa, 1 bar by default
+
+        Returns:
+            k (np.array): The rate coefficients in SI units,
+                          in the shape of (kinetics, T, P)
+        """
+        T_list = np.atleast_1d(np.asarray(T_list, dtype=float))
+        P_list = np.atleast_1d(np.asarray(1e5 if P_list is None else P_list,
+                                          dtype=float))
+        # Evaluate all terms and sum them into rows
+        terms = self.A[:, None] * (T_list[None, :] / self.T0[:, None]) ** self.n[:, None] \
+                * np.exp(-self.Ea[:, None] / (R * T_list[None, :]))
+        row_k = np.zeros((self.row_num, T_list.shape[0]))
+        np.add.at(row_k, self.rows, terms)
+        k = np.repeat(row_k[:self.size, :, None], P_list.shape[0], axis=2)
+        if self.groups:
+            k_pdep = self._interpolate(row_k, np.log(P_list))
+            np.add.at(k, np.array([group[0] for group in self.groups]), k_pdep)
+        for index, kin in self.fallback.items():
+            k[index] = [[kin.get_rate_coefficient(T, P) for P in P_list]
+                        for T in T_list]
+        return k
+
+    def _interpolate(self, row_k, logP_list):
+        """
+        Interpolate the rate coefficients of the pressure dependent groups
+
+        Args:
+            row_k (np.array): The rate coefficients of the rows, in the shape of (rows, T)
+            logP_list (np.array): The logarithms of the pressures
+
+        Returns:
+            (np.array): The rate coefficients in the shape of (groups, T, P)
+        """
+        low, high, weights = [], [], []
+        for _, logPs, level_rows in self.groups:
+            logP = np.clip(logP_list, logPs[0], logPs[-1])
+            if logPs.shape[0] == 1:
+                low.append(np.full(logP.shape, level_rows[0]))
+                high.append(low[-1])
+                weights.append(np.zeros(logP.shape))
+                continue
+            i = np.clip(np.searchsorted(logPs, logP, side='right') - 1,
+                        0, logPs.shape[0] - 2)
+            low.append(level_rows[i])
+            high.append(level_rows[i + 1])
+            weights.append((logP - logPs[i]) / (logPs[i + 1] - logPs[i]))
+        # In the shape of (groups, T, P)
+        k_low = np.transpose(row_k[np.array(low)], (0, 2, 1))
+        k_high = np.transpose(row_k[np.array(high)], (0, 2, 1))
+        weights = np.array(weights)[:, None, :]
+        positive = (k_low > 0) & (k_high > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_k = np.log(np.where(positive, k_low, 1.0)) * (1 - weights) \
+                    + np.log(np.where(positive, k_high, 1.0)) * weights
+        # Non-positive rate coefficients are interpolated linearly
+        return np.where(positive, np.exp(log_k),
+                        k_low + (k_high - k_low) * weights)
+
+
+def _get_arrhenius_terms(kinetics):
+    """
+    Get the modified Arrhenius expressions summed in the kinetics
+
+    Args:
+        kinetics (RMG Kinetics): The kinetics
+
+    Returns:
+        (list): The list of Arrhenius. None if the kinetics is not supported
+    """
+    if isinstance(kinetics, Arrhenius):
+        return [kinetics]
+    elif isinstance(kinetics, MultiArrhenius):
+        terms = []
+        for arrh in kinetics.arrhenius:
+            arrh_terms = _get_arrhenius_terms(arrh)
+            if arrh_terms is None:
+                return
+            terms.extend(arrh_terms)
+        return terms
+
+
+def get_rate_coefficients(kinetics, T_list, P_list=None, labels=None):
+    """
+    Evaluate the rate coefficients of a list of kinetics at a grid of
+    temperatures and pressures
+
+    Args:
+        kinetics (list): A list of RMG kinetics
+        T_list (array_like): The temperatures in K
+        P_list (array_like): The pressures in Pa, 1 bar by default
+        labels (list): The labels of the kinetics
+
+    Returns:
+        k (np.array): The rate coefficients in SI units,
+                      in the shape of (kinetics, T, P)
+    """
+    return PackedKinetics(kinetics, labels=labels).get_rate_coefficients(T_list, P_list)
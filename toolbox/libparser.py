@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+The toolbox for parsing RMG library files without executing them
+"""
+
+import ast
+import logging
+import re
+from collections import OrderedDict
+
+from rmgpy.data.base import Entry
+from rmgpy.data.kinetics.library import LibraryReaction
+from rmgpy.exceptions import DatabaseError
+from rmgpy.kinetics.model import PDepKineticsModel
+from rmgpy.molecule.molecule import Molecule
+
+from toolbox.kineticlib import check_for_duplicates
+from toolbox.reaction import split_rxn_label
+from toolbox.species import StructureIndex
+
+##################################################################
+
+# Literals are parsed into ast.Constant since Python 3.8
+_CONSTANT = getattr(ast, 'Constant', None)
+
+# The collider in a reaction label, e.g., (+M) or (+N2)
+COLLIDER = re.compile(r'\s*\(\+([^)]+)\)')
+
+
+class CallRecord(object):
+    """
+    A call in a library file, e.g., Arrhenius(A=(1e13, 's^-1'), n=0, ...),
+    recorded with its literal arguments without calling it.
+    """
+    __slots__ = ('name', 'args', 'kwargs')
+
+    def __init__(self, name, args, kwargs):
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+
+    def __repr__(self):
+        args = [repr(arg) for arg in self.args] + \
+               ['{0}={1!r}'.format(key, value) for key, value in self.kwargs.items()]
+        return '{0}({1})'.format(self.name, ', '.join(args))
+
+    def __eq__(self, other):
+        return isinstance(other, CallRecord) and self.name == other.name \
+               and self.args == other.args and self.kwargs == other.kwargs
+
+    def build(self, context):
+        """
+        Create the object by calling the callable of the same name in the context
+
+        Args:
+            context (dict): The allowed callables by their names, e.g., the
+                            global context of a RMG database
+
+        Returns:
+            The object created
+
+        Raises:
+            ValueError: If the name is not in the context
+        """
+        if self.name not in context:
+            raise ValueError('{0} is not allowed in the context.'.format(self.name))
+        return context[self.name](*build_value(self.args, context),
+                                  **build_value(self.kwargs, context))
+
+
+class EntryRecord(object):
+    """
+    An entry(...) block in a library file, recorded with its literal fields.
+    The RMG Entry is only created when needed by to_entry.
+
+    Attributes:
+        index (int): The index of the entry
+        label (str): The label of the entry
+        fields (OrderedDict): The other fields of the entry
+        lineno (int): The line number of the entry in the library file
+    """
+    __slots__ = ('index', 'label', 'fields', 'lineno')
+
+    def __init__(self, index, label, fields, lineno=0):
+        self.index = index
+        self.label = label
+        self.fields = fields
+        self.lineno = lineno
+
+    def __repr__(self):
+        return '<EntryRecord {0} "{1}">'.format(self.index, self.label)
+
+    @property
+    def adjlist(self):
+        """The adjacency list of the entry in a thermo library. None if not available"""
+        return self.fields.get('molecule')
+
+    @property
+    def data(self):
+        """The record of the thermo or kinetics data"""
+        for key in ('thermo', 'kinetics', 'statmech', 'transport'):
+            if key in self.fields:
+                return self.fields[key]
+
+    def to_entry(self, context, spc_dict=None, library_label=''):
+        """
+        Create the RMG Entry of the record, the same as loaded by
+        ThermoLibrary.load_entry or KineticsLibrary.load_entry
+
+        Args:
+            context (dict): The allowed callables by their names, e.g., the
+                            global context of a RMG database
+            spc_dict (dict): The species dictionary to create the reaction of
+                             an entry in a kinetics library
+            library_label (str): The label of the kinetics library
+
+        Returns:
+            entry (RMG Entry): The entry
+
+        Raises:
+            DatabaseError: If a species of the reaction is not in the species dictionary
+        """
+        fields = self.fields
+        data = build_value(self.data, context)
+        if 'molecule' in fields:
+            item = Molecule().from_adjacency_list(fields['molecule'])
+        elif spc_dict is not None:
+            item = self._get_reaction(spc_dict, library_label)
+            # Convert SMILES to Molecule objects in collision efficiencies
+            if isinstance(data, PDepKineticsModel):
+                data.efficiencies = {Molecule().from_smiles(key) if isinstance(key, str) else key: value
+                                     for key, value in data.efficiencies.items()}
+        else:
+            item = None
+        return Entry(index=self.index,
+                     label=self.label,
+                     item=item,
+                     data=data,
+                     reference=build_value(fields.get('reference'), context),
+                     reference_type=fields.get('referenceType', ''),
+                     short_desc=fields.get('shortDesc', ''),
+                     long_desc=fields.get('longDesc', '').strip(),
+                     rank=fields.get('rank'))
+
+    def _get_reaction(self, spc_dict, library_label=''):
+        """
+        Create the library reaction of the record from its label and fields
+        """
+        label, specific_collider = COLLIDER.sub('', self.label), None
+        colliders = set(collider.strip() for collider in COLLIDER.findall(self.label))
+        if len(colliders) > 1:
+            raise DatabaseError('The colliders of entry {0} in kinetics library {1} '
+                                'are not consistent.'.format(self.index, library_label))
+        spc_labels = split_rxn_label(label)
+        if not spc_labels:
+            raise DatabaseError('The label of entry {0} in kinetics library {1} '
+                                'is not legal.'.format(self.index, library_label))
+        collider = colliders.pop() if colliders else 'M'
+        for spc_label in spc_labels[0] + spc_labels[1] + ([collider] if collider != 'M' else []):
+            if spc_label not in spc_dict:
+                raise DatabaseError('Species {0} in kinetics library {1} is missing '
+                                    'from its dictionary.'.format(spc_label, library_label))
+        if collider != 'M':
+            specific_collider = spc_dict[collider]
+        fields = self.fields
+        return LibraryReaction(reactants=[spc_dict[spc_label] for spc_label in spc_labels[0]],
+                               products=[spc_dict[spc_label] for spc_label in spc_labels[1]],
+                               specific_collider=specific_collider,
+                               degeneracy=fields.get('degeneracy', 1),
+                               duplicate=fields.get('duplicate', False),
+                               reversible=fields.get('reversible', True),
+                               allow_pdep_route=fields.get('allow_pdep_route', False),
+                               elementary_high_p=fields.get('elementary_high_p', False),
+                               allow_max_rate_violation=fields.get('allow_max_rate_violation', False),
+                               library=library_label)
+
+
+def build_value(value, context):
+    """
+    Create the objects of the call records in a value
+
+    Args:
+        value: A literal value, a call record, or a container of them
+        context (dict): The allowed callables by their names
+
+    Returns:
+        The value with the call records replaced by the objects created
+    """
+    if isinstance(value, CallRecord):
+        return value.build(context)
+    elif isinstance(value, (list, tuple)):
+        return type(value)(build_value(item, context) for item in value)
+    elif isinstance(value, dict):
+        return type(value)((key, build_value(item, context)) for key, item in value.items())
+    return value
+
+
+def parse_library(lib_path):
+    """
+    Parse a RMG library file into the header and entry records
+    without executing the file.
+
+    Args:
+        lib_path (str): The path to the library file
+
+    Returns:
+        header (OrderedDict): The top level assignments, e.g., name and longDesc
+        records (list): The entry records in the file order
+    """
+    with open(lib_path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=lib_path)
+    header, records = OrderedDict(), []
+    for node in tree.body:
+        if isinstance(node, ast.Expr) and isinstance(node.value, ast.Call) \
+                and isinstance(node.value.func, ast.Name) and node.value.func.id == 'entry':
+            records.append(_parse_entry(node.value, lib_path))
+        elif isinstance(node, ast.Assign) and len(node.targets) == 1 \
+                and isinstance(node.targets[0], ast.Name):
+            try:
+                header[node.targets[0].id] = _convert_node(node.value)
+            except ValueError as e:
+                logging.debug('Skip the assignment at {0}:{1} ({2}).'.format(
+                    lib_path, node.lineno, e))
+    return header, records
+
+
+def build_library(lib_path, library, context, spc_dict=None):
+    """
+    Load a RMG library from its file by parsing it into records and creating
+    the entries, as an alternative to executing the file by library.load.
+    The entries are checked as in ThermoLibrary.load or KineticsLibrary.load,
+    i.e., the molecules of a thermo library must have unique labels and
+    structures, and the reactions of a kinetics library must be balanced with
+    the duplicates marked. The duplicates are converted to multi kinetics.
+
+    Args:
+        lib_path (str): The path to the library file
+        library (RMG ThermoLibrary/KineticsLibrary): The library to be loaded into
+        context (dict): The allowed callables by their names, e.g., the
+                        global context of a RMG database
+        spc_dict (dict): The species dictionary for a kinetics library
+
+    Returns:
+        library (RMG ThermoLibrary/KineticsLibrary): The library loaded
+
+    Raises:
+        DatabaseError: If an entry is duplicate, or a reaction is not balanced
+    """
+    header, records = parse_library(lib_path)
+    library.name = header.get('name', library.name)
+    library.short_desc = header.get('shortDesc', '')
+    library.long_desc = header.get('longDesc', '').strip()
+    library.entries = OrderedDict()
+    if spc_dict is None:
+        # Checked the same as ThermoLibrary.load_entry
+        index = StructureIndex()
+        for record in records:
+            if record.label in library.entries:
+                raise DatabaseError('Found a duplicate molecule with label {0} in the thermo '
+                                    'library {1}.'.format(record.label, library.name))
+            entry = record.to_entry(context)
+            if entry.item is not None:
+                found = index.find(entry.item)
+                if found is not None and found.item.multiplicity == entry.item.multiplicity:
+                    raise DatabaseError('Adjacency list and multiplicity of {0} matches that of '
+                                        'existing molecule {1} in thermo library {2}.'.format(
+                                            record.label, found.label, library.name))
+                index.add(entry.item, entry)
+            library.entries[record.label] = entry
+    else:
+        for record in records:
+            # Keyed the same as KineticsLibrary.load
+            library.entries['{0:d}:{1}'.format(record.index, record.label)] = \
+                record.to_entry(context, spc_dict=spc_dict, library_label=library.label)
+        for entry in library.entries.values():
+            if not entry.item.is_balanced():
+                raise DatabaseError('Reaction {0} in kinetics library {1} is not balanced.'.format(
+                    entry.item, library.label))
+        check_for_duplicates(library)
+        library.convert_duplicates_to_multi()
+    return library
+
+
+def _parse_entry(node, lib_path=''):
+    """
+    Convert an entry(...) call node into an entry record
+    """
+    if node.args:
+        raise ValueError('Positional arguments of entry at {0}:{1} are not supported.'.format(
+            lib_path, node.lineno))
+    fields = OrderedDict()
+    for keyword in node.keywords:
+        try:
+            fields[keyword.arg] = _convert_node(keyword.value)
+        except ValueError as e:
+            raise ValueError('Failed to parse {0} of entry at {1}:{2} ({3}).'.format(
+                keyword.arg, lib_path, node.lineno, e))
+    return EntryRecord(fields.pop('index', None), fields.pop('label', None),
+                       fields, lineno=node.lineno)
+
+
+def _convert_node(node):
+    """
+    Convert an expression node of literals and calls into the value
+    """
+    if type(node) is _CONSTANT:
+        return node.value
+    elif type(node) is ast.UnaryOp and type(node.op) is ast.USub \
+            and type(node.operand) is _CONSTANT and isinstance(node.operand.value, (int, float)):
+        return -node.operand.value
+    elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+        return CallRecord(node.func.id,
+                          tuple(_convert_node(arg) for arg in node.args),
+                          OrderedDict((keyword.arg, _convert_node(keyword.value))
+                                      for keyword in node.keywords))
+    elif isinstance(node, ast.Tuple):
+        return tuple(_convert_node(elt) for elt in node.elts)
+    elif isinstance(node, ast.List):
+        return [_convert_node(elt) for elt in node.elts]
+    elif isinstance(node, ast.Dict):
+        return OrderedDict((_convert_node(key), _convert_node(value))
+                           for key, value in zip(node.keys, node.values))
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        raise ValueError('Unsupported expression {0} at line {1}'.format(
+            type(node).__name__, node.lineno))
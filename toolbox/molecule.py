@@ -3,71 +3,552 @@
 The toolbox for molecule related tasks
 """
 
+import http.client
 import logging
 import os
-import urllib
+import sqlite3
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from rmgpy.exceptions import AtomTypeError
 from rmgpy.molecule.molecule import Molecule
 
+from toolbox.base import connect_cache_db, map_in_pool
+
 ##################################################################
 
-def get_molecule_from_identifier(identifier):
+# The resolver used for common names, {0} is replaced by the quoted name
+RESOLVER_URL = os.environ.get('RMG_TOOLS_RESOLVER_URL',
+                              'https://cactus.nci.nih.gov/chemical/structure/{0}/smiles')
+# The lifetime (in seconds) and the maximum size of the identifier cache
+IDENTIFIER_CACHE_TTL = 30 * 24 * 3600
+IDENTIFIER_CACHE_SIZE = 100000
+# Common names which are not sent to the resolver
+KNOWN_NAMES = {
+    'o2': '[O][O]',
+    'oxygen': '[O][O]',
+    'benzyl': '[CH2]c1ccccc1',
+    'phenyl': '[c]1ccccc1',
+}
+# The maximum number of structure keys whose resonance structures are memoized
+RESONANCE_CACHE_SIZE = 10000
+# By default, identifiers are only parsed in a process pool if there are at least
+# this many to parse, since starting a pool costs more than parsing a few of them
+PARSE_POOL_MIN_SIZE = 500
+
+
+def get_molecule_from_identifier(identifier, use_cache=True, offline=False, resolver=None):
     """
-    Get species according to the string identifier input
+    Get species according to the string identifier input. The resolved
+    identifiers are stored in a persistent cache, so that the same
+    identifier is not parsed or sent to the resolver again.
 
     Args:
         identifier (str): Identifiers used to generate species, currently 
                           support SMILES, InChI, adjacency list and common names
+        use_cache (bool): Whether to use the persistent identifier cache
+        offline (bool): Do not send common names to the resolver if True,
+                        only the names in the cache are available
+        resolver (function): A function takes a common name as input and
+                             returns its SMILES. By default, resolve_name
 
     Return:
         spc (RMG Species): An RMG species object corresponding to the identifier
     """
-    known_names = {
-        'o2': '[O][O]',
-        'oxygen': '[O][O]',
-        'benzyl': '[CH2]c1ccccc1',
-        'phenyl': '[c]1ccccc1',
-    }
     identifier = identifier.strip()
-    molecule = Molecule()
     if not identifier:
         logging.error('Invalid empty identifier.')
         return
+    # Adjacency lists are not worth caching
+    use_cache = use_cache and not is_adjacency_list(identifier)
+    if use_cache:
+        key = normalize_identifier(identifier)
+        adjlist = read_identifier_cache([key]).get(key)
+        if adjlist:
+            return Molecule().from_adjacency_list(adjlist)
+    molecule = parse_identifier(identifier, offline=offline, resolver=resolver)
+    if molecule and use_cache:
+        write_identifier_cache({key: molecule.to_adjacency_list()})
+    return molecule
+
+
+def get_molecules_from_identifiers(identifiers, use_cache=True, offline=False, url=None,
+                                   processes=None, threads=8, retries=3, backoff=0.5):
+    """
+    Get molecules according to a batch of string identifiers. SMILES, InChI
+    and adjacency lists are parsed in a process pool, and the remaining common
+    names are sent to the resolver concurrently through persistent connections.
+
+    Args:
+        identifiers (list): Identifiers used to generate species, currently 
+                            support SMILES, InChI, adjacency list and common names
+        use_cache (bool): Whether to use the persistent identifier cache
+        offline (bool): Do not send common names to the resolver if True,
+                        only the names in the cache are available
+        url (str): The url template of the resolver. By default, RESOLVER_URL
+        processes (int): The number of processes used to parse identifiers. By default,
+                         a process pool is only used for PARSE_POOL_MIN_SIZE or more
+        threads (int): The number of concurrent requests sent to the resolver
+        retries (int): The number of retries of a failed request
+        backoff (num): The delay in seconds before the first retry, which
+                       doubles for each following retry
+
+    Return:
+        molecules (list): RMG molecules corresponding to the identifiers. The
+                          unresolvable identifiers correspond to None
+    """
+    keys = [normalize_identifier(identifier) for identifier in identifiers]
+    adjlists = {}
+    if use_cache:
+        adjlists.update(read_identifier_cache(
+            [key for key in set(keys) if not is_adjacency_list(key)]))
+    # Parse the identifiers locally
+    to_parse = [key for key in dict.fromkeys(keys) if key and key not in adjlists]
+    if processes is None and len(to_parse) < PARSE_POOL_MIN_SIZE:
+        processes = 1
+    parsed = map_in_pool(_parse_local_identifier, to_parse, processes=processes)
+    new_adjlists, names = {}, []
+    for key, (adjlist, is_name) in zip(to_parse, parsed):
+        if is_name:
+            names.append(key)
+        elif adjlist:
+            new_adjlists[key] = adjlist
+    # Resolve the common names remotely
+    if names and offline:
+        logging.error('{0} identifiers are not resolvable in offline mode.'.format(len(names)))
+    elif names:
+        for name, smiles in resolve_names(names, url=url, threads=threads,
+                                          retries=retries, backoff=backoff).items():
+            if not smiles:
+                logging.error('Invalid identifier {0} for NCI resolver.'.format(name))
+                continue
+            molecule = _get_molecule_from_smiles(smiles)
+            if molecule:
+                new_adjlists[name] = molecule.to_adjacency_list()
+    if use_cache:
+        write_identifier_cache({key: adjlist for key, adjlist in new_adjlists.items()
+                                if not is_adjacency_list(key)})
+    adjlists.update(new_adjlists)
+    molecules = {key: Molecule().from_adjacency_list(adjlist)
+                 for key, adjlist in adjlists.items()}
+    return [molecules.get(key) for key in keys]
+
+
+def get_structure_key(molecule):
+    """
+    Get a canonical key of the molecule structure, which is the InChIKey
+    combined with the multiplicity. Isomorphic molecules and resonance
+    structures share the same key, while different structures are
+    unlikely to collide.
+
+    Args:
+        molecule (RMG Molecule): The molecule
+
+    Returns:
+        (str): The structure key. None if InChIKey is not available
+    """
+    try:
+        return '{0}-{1}'.format(molecule.to_inchi_key(), molecule.multiplicity)
+    except Exception:
+        return
+
+
+class ResonanceCache(object):
+    """
+    A bounded LRU cache of resonance structures keyed by the structure keys.
+    Structures sharing a key are told apart by isomorphism. The molecule
+    itself is returned first, followed by copies of its other memoized
+    resonance structures with their atoms ordered and labeled as in the molecule,
+    as Molecule.generate_resonance_structures does.
+    """
+
+    def __init__(self, max_size=RESONANCE_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self._cache.values())
+
+    def get(self, molecule, keep_isomorphic=False):
+        """
+        Get the resonance structures of the molecule
+
+        Args:
+            molecule (RMG Molecule): The molecule
+            keep_isomorphic (bool): Whether to keep isomorphic resonance structures
+
+        Returns:
+            (list): The resonance structures. On a cache hit, the molecule itself
+                    comes first
+        """
+        key = get_structure_key(molecule)
+        if key is None:
+            self.misses += 1
+            return molecule.generate_resonance_structures(keep_isomorphic=keep_isomorphic)
+        key = (key, keep_isomorphic)
+        bucket = self._cache.get(key, [])
+        for structures in bucket:
+            for i, structure in enumerate(structures):
+                mappings = molecule.find_isomorphism(structure)
+                if mappings:
+                    self.hits += 1
+                    self._cache.move_to_end(key)
+                    # Keep the molecule itself in place of its cached isomorph,
+                    # and align the other structures with its atoms
+                    return [molecule] + [_get_aligned_copy(other, structure, molecule, mappings[0])
+                                         for j, other in enumerate(structures) if j != i]
+        self.misses += 1
+        structures = molecule.generate_resonance_structures(keep_isomorphic=keep_isomorphic)
+        self._cache[key] = bucket + [[structure.copy(deep=True) for structure in structures]]
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        return structures
+
+    def info(self):
+        """
+        Get the statistics of the cache
+
+        Returns:
+            (dict): The hits, misses and size of the cache
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self)}
+
+    def clear(self):
+        """
+        Clear the cache and its statistics
+        """
+        self._cache.clear()
+        self.hits = self.misses = 0
+
+
+def _get_aligned_copy(structure, template, molecule, mapping):
+    """
+    Copy a resonance structure with its atoms ordered and labeled as in the
+    molecule. The structure has the same atom order as the template, and the
+    mapping maps the atoms of the molecule to the atoms of the template.
+    """
+    copy = structure.copy(deep=True)
+    indices = {atom: index for index, atom in enumerate(template.atoms)}
+    copy.atoms = [copy.atoms[indices[mapping[atom]]] for atom in molecule.atoms]
+    for atom, copied in zip(molecule.atoms, copy.atoms):
+        copied.label = atom.label
+    return copy
+
+
+# The process-wide resonance cache used by the toolbox
+resonance_cache = ResonanceCache()
+
+
+def generate_resonance_structures(item):
+    """
+    Generate the resonance structures through the process-wide resonance cache.
+    For a species, its molecule list is updated in place the same as
+    Species.generate_resonance_structures.
+
+    Args:
+        item (RMG Species/Molecule): The species or the molecule
+
+    Returns:
+        (list): The resonance structures
+    """
+    if isinstance(item, Molecule):
+        return resonance_cache.get(item)
+    # Resonance structures are already generated
+    if len(item.molecule) > 1 and item.molecule[1].reactive:
+        return item.molecule
+    item.molecule = resonance_cache.get(item.molecule[0], keep_isomorphic=True)
+    return item.molecule
+
+
+def normalize_identifier(identifier):
+    """
+    Normalize the identifier by removing redundant whitespaces
+
+    Args:
+        identifier (str): The identifier
+
+    Returns:
+        (str): The normalized identifier
+    """
+    if is_adjacency_list(identifier):
+        return identifier.strip()
+    return ' '.join(identifier.split())
+
+
+def is_adjacency_list(identifier):
+    """
+    Check if the identifier is an adjacency list
+
+    Args:
+        identifier (str): The identifier
+
+    Returns:
+        (bool): True if the identifier is regarded as an adjacency list
+    """
+    return all(char in identifier.lower() for char in ['u', 'p', 'c', '{'])
+
+
+def parse_identifier(identifier, offline=False, resolver=None):
+    """
+    Parse the string identifier without the identifier cache
+
+    Args:
+        identifier (str): Identifiers used to generate species, currently 
+                          support SMILES, InChI, adjacency list and common names
+        offline (bool): Do not send common names to the resolver if True
+        resolver (function): A function takes a common name as input and
+                             returns its SMILES. By default, resolve_name
+
+    Return:
+        molecule (RMG Molecule): An RMG molecule object corresponding to the identifier
+    """
+    identifier = identifier.strip()
+    molecule, is_name = parse_local_identifier(identifier)
+    if not is_name:
+        return molecule
+    if offline:
+        logging.error('Identifier %s is not resolvable in offline mode.' % (identifier))
+        return
+    smiles = (resolver or resolve_name)(identifier)
+    if not smiles:
+        logging.error('Invalid identifier for NCI resolver.')
+        return
+    return _get_molecule_from_smiles(smiles)
+
+
+def parse_local_identifier(identifier):
+    """
+    Parse the string identifier without sending it to the resolver
+
+    Args:
+        identifier (str): Identifiers used to generate species, currently 
+                          support SMILES, InChI, adjacency list and common names
+
+    Return:
+        molecule (RMG Molecule): An RMG molecule object corresponding to the identifier
+        is_name (bool): Whether the identifier is regarded as a common name
+                        which needs to be resolved
+    """
+    molecule = Molecule()
+    if not identifier:
+        logging.error('Invalid empty identifier.')
+        return None, False
     elif identifier.startswith('InChI=1'):
         try:
             molecule.from_inchi(identifier)
         except:
             logging.error('Invalid InChI identifier.')
-            return
-    elif identifier.lower() in known_names:
-        molecule.from_smiles(known_names[identifier.lower()])
+            return None, False
+    elif identifier.lower() in KNOWN_NAMES:
+        molecule.from_smiles(KNOWN_NAMES[identifier.lower()])
+    elif not is_adjacency_list(identifier):
+        try:
+            molecule.from_smiles(identifier)
+        except (KeyError, AtomTypeError):
+            logging.error('Invalid SMILES identifier.')
+            return None, False
+        except (IOError, ValueError):
+            return None, True
     else:
-        for char in ['u', 'p', 'c', '{']:
-            if char not in identifier.lower():
-                try:
-                    molecule.from_smiles(identifier)
-                except (KeyError, AtomTypeError):
-                    logging.error('Invalid SMILES identifier.')
-                    return
-                except (IOError, ValueError):
-                    url = "https://cactus.nci.nih.gov/chemical/structure/{0}/smiles".format(
-                        urllib.parse.quote(identifier))
-                    try:
-                        f = urllib.request.urlopen(url, timeout=10)
-                    except:
-                        logging.error('Invalid identifier for NCI resolver.')
-                        return
-                    smiles = f.read().decode('utf-8')
-                    try:
-                        molecule.from_smiles(smiles)
-                    except (KeyError, AtomTypeError):
-                        logging.error('Invalid identifier.')
-                break
-        else:
+        try:
+            molecule.from_adjacency_list(identifier)
+        except:
+            logging.error('Invalid adjacency list identifier.')
+            return None, False
+    return molecule, False
+
+
+def _parse_local_identifier(identifier):
+    """
+    Parse the string identifier into an adjacency list, used by the
+    process pool in get_molecules_from_identifiers
+
+    Args:
+        identifier (str): The identifier
+
+    Returns:
+        adjlist (str): The adjacency list. None if not parsable
+        is_name (bool): Whether the identifier needs to be resolved
+    """
+    molecule, is_name = parse_local_identifier(identifier)
+    if molecule:
+        return molecule.to_adjacency_list(), is_name
+    return None, is_name
+
+
+def _get_molecule_from_smiles(smiles):
+    """
+    Get molecule from the SMILES returned by the resolver
+
+    Args:
+        smiles (str): The SMILES
+
+    Return:
+        molecule (RMG Molecule): An RMG molecule object. None if not parsable
+    """
+    try:
+        return Molecule().from_smiles(smiles)
+    except (KeyError, AtomTypeError):
+        logging.error('Invalid identifier.')
+
+
+def resolve_name(name, url=None, timeout=10):
+    """
+    Resolve a common name to SMILES through the resolver
+
+    Args:
+        name (str): The common name
+        url (str): The url template of the resolver. By default, RESOLVER_URL
+        timeout (num): The timeout in seconds
+
+    Returns:
+        smiles (str): The SMILES of the name. None if not resolvable
+    """
+    url = (url or RESOLVER_URL).format(urllib.parse.quote(name))
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as f:
+            return f.read().decode('utf-8').strip()
+    except Exception:
+        return
+
+
+def resolve_names(names, url=None, threads=8, retries=3, backoff=0.5, timeout=10):
+    """
+    Resolve common names to SMILES through the resolver concurrently. Each
+    thread keeps its connection alive to reuse it for the following requests.
+
+    Args:
+        names (list): The common names
+        url (str): The url template of the resolver. By default, RESOLVER_URL
+        threads (int): The number of concurrent requests
+        retries (int): The number of retries of a failed request
+        backoff (num): The delay in seconds before the first retry, which
+                       doubles for each following retry
+        timeout (num): The timeout in seconds
+
+    Returns:
+        smiles_dict (dict): The SMILES of the names. None if not resolvable
+    """
+    url = url or RESOLVER_URL
+    local = threading.local()
+    connections = []
+
+    def resolve(name):
+        parts = urllib.parse.urlsplit(url.format(urllib.parse.quote(name)))
+        path = parts.path + ('?' + parts.query if parts.query else '')
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(backoff * 2 ** (attempt - 1))
+            conn = getattr(local, 'conn', None)
+            if conn is None:
+                conn_class = http.client.HTTPSConnection if parts.scheme == 'https' \
+                             else http.client.HTTPConnection
+                conn = local.conn = conn_class(parts.netloc, timeout=timeout)
+                connections.append(conn)
             try:
-                molecule.from_adjacency_list(identifier)
-            except:
-                logging.error('Invalid adjacency list identifier.')
+                conn.request('GET', path)
+                response = conn.getresponse()
+                content = response.read()
+            except (http.client.HTTPException, OSError):
+                # Reconnect for the next attempt
+                conn.close()
+                local.conn = None
+                continue
+            if response.status == 200:
+                return content.decode('utf-8').strip()
+            elif response.status < 500:
+                # Not resolvable, no need to retry
                 return
-    return molecule
+        logging.warning('Failed to resolve {0} after {1} retries.'.format(name, retries))
+
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            smiles_list = list(executor.map(resolve, names))
+    finally:
+        for conn in connections:
+            conn.close()
+    return dict(zip(names, smiles_list))
+
+
+def read_identifier_cache(keys, cache_dir=None, ttl=None):
+    """
+    Read the adjacency lists of identifiers from the identifier cache
+
+    Args:
+        keys (list): The normalized identifiers
+        cache_dir (str): The directory of the cache. By default, CACHE_DIR
+        ttl (num): The lifetime of the entries in seconds. By default,
+                   IDENTIFIER_CACHE_TTL
+
+    Returns:
+        adjlists (dict): The adjacency lists of the identifiers cached and not expired
+    """
+    ttl = ttl or IDENTIFIER_CACHE_TTL
+    adjlists = {}
+    try:
+        conn = _connect_identifier_cache(cache_dir)
+        with conn:
+            conn.execute('DELETE FROM identifiers WHERE created < ?',
+                         (time.time() - ttl,))
+            for key in keys:
+                row = conn.execute('SELECT adjlist FROM identifiers WHERE key = ?',
+                                   (key,)).fetchone()
+                if row:
+                    adjlists[key] = row[0]
+            conn.executemany('UPDATE identifiers SET accessed = ? WHERE key = ?',
+                             [(time.time(), key) for key in adjlists])
+        conn.close()
+    except (sqlite3.Error, OSError) as e:
+        logging.debug('Identifier cache is not available ({0}).'.format(e))
+    return adjlists
+
+
+def write_identifier_cache(adjlists, cache_dir=None, max_entries=None):
+    """
+    Write the adjacency lists of identifiers into the identifier cache.
+    The least recently used entries are evicted if the cache is full.
+
+    Args:
+        adjlists (dict): The adjacency lists keyed by the normalized identifiers
+        cache_dir (str): The directory of the cache. By default, CACHE_DIR
+        max_entries (int): The maximum size of the cache. By default,
+                           IDENTIFIER_CACHE_SIZE
+    """
+    if not adjlists:
+        return
+    max_entries = max_entries or IDENTIFIER_CACHE_SIZE
+    try:
+        conn = _connect_identifier_cache(cache_dir)
+        with conn:
+            conn.executemany('INSERT OR REPLACE INTO identifiers VALUES (?, ?, ?, ?)',
+                             [(key, adjlist, time.time(), time.time())
+                              for key, adjlist in adjlists.items()])
+            conn.execute('DELETE FROM identifiers WHERE rowid IN (SELECT rowid FROM identifiers '
+                         'ORDER BY accessed LIMIT max(0, (SELECT count(*) FROM identifiers) - ?))',
+                         (max_entries,))
+        conn.close()
+    except (sqlite3.Error, OSError) as e:
+        logging.debug('Identifier cache is not available ({0}).'.format(e))
+
+
+def _connect_identifier_cache(cache_dir=None):
+    """
+    Connect to the identifier cache
+
+    Args:
+        cache_dir (str): The directory of the cache. By default, CACHE_DIR
+
+    Returns:
+        conn (sqlite3.Connection): The connection to the cache database
+    """
+    conn = connect_cache_db('identifiers', cache_dir=cache_dir)
+    conn.execute('CREATE TABLE IF NOT EXISTS identifiers (key TEXT PRIMARY KEY, '
+                 'adjlist TEXT, created REAL, accessed REAL)')
+    return conn
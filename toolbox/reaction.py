@@ -5,16 +5,39 @@ The toolbox for reaction related tasks
 
 import logging
 import re
-from copy import deepcopy
+from collections import ChainMap, OrderedDict
 
 from rmgpy.molecule.molecule import Molecule
 from rmgpy.species import Species
 from rmgpy.kinetics.arrhenius import Arrhenius, MultiArrhenius, PDepArrhenius
 
+from toolbox.molecule import generate_resonance_structures, get_structure_key
 from toolbox.species import add_spc_to_spc_dict
 
 ##################################################################
 
+# The reaction arrow and the separator of species in reaction labels
+RXN_ARROW = re.compile(r'<?=>')
+SPC_SEPARATOR = re.compile(r'\s*\+\s*')
+
+
+def split_rxn_label(label):
+    """
+    Split reaction label to reactant labels and product labels
+
+    Args:
+        label (str): reaction label in RMG style
+
+    Returns:
+        (tuple): reactant labels (list) and product labels (list). None if not legal
+    """
+    sides = RXN_ARROW.split(label)
+    if len(sides) != 2 or not sides[0].strip() or not sides[1].strip():
+        logging.error('The reaction label %s is not legal' %(label))
+        return
+    return [SPC_SEPARATOR.split(side.strip()) for side in sides]
+
+
 def parse_rxn_label(label, spc_dict, interactive=False, resonance=True):
     """
     Convert reaction label to reactants, products and reversible
@@ -25,26 +48,17 @@ def parse_rxn_label(label, spc_dict, interactive=False, resonance=True):
         interactive (bool): if parse in an interactive way
         resonance (bool): if generate resonance structure for reactants and product
     """
-    # Make a copy of species dictionary to avoid overwriting
-    spc_dict_backup = deepcopy(spc_dict)
-    # Check if reaction arrow contained
-    arrow = re.search(r'[<]?[=][>]', label).group()
-    if not arrow:
-        logging.error('The reaction label %s is not legal' %(label))
-        return
-    # Parse the reaction label into species labels
-    [left, right] = label.split(arrow)
-    if left and right:
-        reactant_labels = [label.strip() for label in left.split("+")]
-        product_labels = [label.strip() for label in right.split("+")]
-    else:
-        # Check if any side is empty
-        logging.error('The reaction label %s is not legal' % (label))
+    labels = split_rxn_label(label)
+    if not labels:
         return
+    reactant_labels, product_labels = labels
+    # Species added in the interactive mode are kept in an overlay
+    # and only committed to the species dictionary on success
+    spc_overlay = ChainMap(OrderedDict(), spc_dict)
     # Check if species is not parsable by species dictionary
     for label in reactant_labels + product_labels:
         # Modify the label or extend species dictionary if interactive mode
-        if label not in spc_dict_backup and interactive:
+        if label not in spc_overlay and interactive:
             add_or_correct = 'wrong'
             logging.info('Species label "%s" is not recoganizable.' %(label))
             while add_or_correct.lower() not in 'add' \
@@ -52,32 +66,190 @@ def parse_rxn_label(label, spc_dict, interactive=False, resonance=True):
                 add_or_correct = input('Add a species (type "add") or correct the label (type "correct"):')
                 if add_or_correct.lower() in 'add':
                     # If successful return new label, nonetype otherwise
-                    new_label = add_spc_to_spc_dict('', '', spc_dict_backup, interactive=True)
+                    new_label = add_spc_to_spc_dict('', '', spc_overlay, interactive=True)
                 elif add_or_correct.lower() in 'correct':
                     new_label = input('Enter the correct species label:')
                 else:
                     new_label = None
-                if new_label in spc_dict_backup and label in reactant_labels:
+                if new_label in spc_overlay and label in reactant_labels:
                     reactant_labels[reactant_labels.index(label)] = new_label
-                elif new_label in spc_dict_backup and label in product_labels:
+                elif new_label in spc_overlay and label in product_labels:
                     product_labels[product_labels.index(label)] = new_label
                 else:
                     add_or_correct = 'wrong'
                     logging.error('Invalid addition or correction.')
-        elif label not in spc_dict_backup:
+        elif label not in spc_overlay:
             logging.error("label %s is not in the species dict." % (label))
             return
-    reactants = [spc_dict_backup[label] for label in reactant_labels]
-    products = [spc_dict_backup[label] for label in product_labels]
-    spc_dict.update(spc_dict_backup)
+    reactants = [spc_overlay[label] for label in reactant_labels]
+    products = [spc_overlay[label] for label in product_labels]
+    spc_dict.update(spc_overlay.maps[0])
     if resonance:
-        for reactant in reactants:
-            reactant.generate_resonance_structures()
-        for product in products:
-            product.generate_resonance_structures()
+        for spc in reactants + products:
+            generate_resonance_structures(spc)
     return reactants, products
 
 
+def parse_rxn_labels(labels, spc_dict, resonance=True):
+    """
+    Convert reaction labels to reactants and products in batch
+
+    Args:
+        labels (list): reaction labels in RMG style
+        spc_dict (OrderedDict): an ordered dictionary has all species information
+        resonance (bool): if generate resonance structure for reactants and product
+
+    Returns:
+        rxns (OrderedDict): reaction labels as keys and (reactants, products)
+                            as values. The value is None if the label cannot be parsed
+    """
+    rxns = OrderedDict()
+    for label in labels:
+        if label in rxns:
+            continue
+        spc_labels = split_rxn_label(label)
+        if spc_labels is None:
+            rxns[label] = None
+            continue
+        missing = [spc_label for spc_label in spc_labels[0] + spc_labels[1]
+                   if spc_label not in spc_dict]
+        if missing:
+            logging.error('label %s is not in the species dict.' % (', '.join(missing)))
+            rxns[label] = None
+            continue
+        rxns[label] = tuple([spc_dict[spc_label] for spc_label in side]
+                            for side in spc_labels)
+    if resonance:
+        # Each species is only processed once, however many reactions it is in
+        processed = set()
+        for rxn in rxns.values():
+            for spc in rxn[0] + rxn[1] if rxn else []:
+                if id(spc) not in processed:
+                    processed.add(id(spc))
+                    generate_resonance_structures(spc)
+    return rxns
+
+
+def parse_rxn_labels_from_file(file_path, spc_dict, resonance=True):
+    """
+    Convert the reaction labels in a file to reactants and products. Each
+    non-empty line is a reaction label, and lines starting with '#' or
+    '!' are comments.
+
+    Args:
+        file_path (str): the path to the file of reaction labels
+        spc_dict (OrderedDict): an ordered dictionary has all species information
+        resonance (bool): if generate resonance structure for reactants and product
+
+    Returns:
+        rxns (OrderedDict): reaction labels as keys and (reactants, products)
+                            as values. The value is None if the label cannot be parsed
+    """
+    with open(file_path, 'r') as f:
+        labels = [line.strip() for line in f]
+    rxns = parse_rxn_labels([label for label in labels
+                             if label and label[0] not in '#!'],
+                            spc_dict, resonance=resonance)
+    parsed = sum(1 for rxn in rxns.values() if rxn)
+    logging.info('%d of %d reaction labels are parsed from %s'
+                 % (parsed, len(rxns), file_path))
+    return rxns
+
+
+class ReactionIndex(object):
+    """
+    An index of reactions bucketed by the structure keys of their reactants
+    and products, so that isomorphism is only checked between the reactions
+    with the same key. The key does not depend on the order of species or the
+    direction of the reaction, so that a reaction can be matched in both
+    directions. The reactions whose keys are not available are compared
+    with all reactions.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.unkeyed = []
+        # The structure keys of the species, by the ids of the species
+        self._spc_keys = {}
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self.buckets.values()) + len(self.unkeyed)
+
+    def get_key(self, rxn):
+        """
+        Get the key of a reaction, which is the same in both directions
+
+        Args:
+            rxn (RMG Reaction): The reaction
+
+        Returns:
+            (tuple): The sorted structure keys of the reactants and the products.
+                     None if the key of any species is not available
+        """
+        sides = []
+        for spcs in (rxn.reactants, rxn.products):
+            keys = []
+            for spc in spcs:
+                if id(spc) not in self._spc_keys:
+                    # Keep the species, so that its id is not reused
+                    self._spc_keys[id(spc)] = (spc, get_structure_key(spc.molecule[0]))
+                keys.append(self._spc_keys[id(spc)][1])
+            if None in keys:
+                return
+            sides.append(tuple(sorted(keys)))
+        return tuple(sorted(sides))
+
+    def add(self, rxn, value=None):
+        """
+        Add a reaction to the index
+
+        Args:
+            rxn (RMG Reaction): The reaction
+            value: The value returned when the reaction is found. By default, the reaction
+        """
+        value = rxn if value is None else value
+        key = self.get_key(rxn)
+        if key:
+            self.buckets.setdefault(key, []).append((rxn, value))
+        else:
+            self.unkeyed.append((rxn, value))
+
+    def iter_matches(self, rxn, reversible=True):
+        """
+        Iterate over the values of the indexed reactions isomorphic to the reaction
+
+        Args:
+            rxn (RMG Reaction): The reaction to search
+            reversible (bool): Whether to match the reactions in the reverse direction
+
+        Yields:
+            The values of the isomorphic reactions
+        """
+        key = self.get_key(rxn)
+        if key:
+            candidates = self.buckets.get(key, []) + self.unkeyed
+        else:
+            candidates = [pair for bucket in self.buckets.values() for pair in bucket] \
+                         + self.unkeyed
+        for indexed, value in candidates:
+            if indexed is not rxn and \
+                    rxn.is_isomorphic(indexed, either_direction=reversible):
+                yield value
+
+    def find(self, rxn, reversible=True):
+        """
+        Find the value of an indexed reaction isomorphic to the reaction
+
+        Args:
+            rxn (RMG Reaction): The reaction to search
+            reversible (bool): Whether to match the reactions in the reverse direction
+
+        Returns:
+            The value of the isomorphic reaction. None if not found
+        """
+        return next(self.iter_matches(rxn, reversible=reversible), None)
+
+
 def get_arrhenius_from_param(params, settings, arrh_type='Arrhenius'):
     """
     Get Arrhenius object given params and settings
@@ -5,17 +5,30 @@ The toolbox for species related tasks
 
 import logging
 import os
+import pickle
 import re
+import time
+import yaml
+from collections import ChainMap, OrderedDict
+from collections.abc import MutableMapping
 
 from rmgpy.data.kinetics import KineticsLibrary
+from rmgpy.exceptions import DatabaseError
 from rmgpy.molecule.molecule import Molecule
 from rmgpy.species import Species
 
-from toolbox.base import find_blocks, read_block, read_yaml_file, write_yaml_file
-from toolbox.molecule import get_molecule_from_identifier
+from toolbox.base import YamlDumper, atomic_open, find_blocks, get_file_digest, iter_block, \
+                         map_in_pool, read_block, read_yaml_file
+from toolbox.molecule import generate_resonance_structures, get_molecule_from_identifier, \
+                             get_structure_key
 
 ##################################################################
 
+# By default, species are only serialized in a process pool if there are at least
+# this many, since starting a pool costs more than serializing a few species
+SERIALIZE_POOL_MIN_SIZE = 1000
+
+
 def get_spc_list_from_labels(label_list, spc_dict):
     """
     Convert a list of species labels to a list of species info according to species dictionary
@@ -60,7 +73,7 @@ def rmg_chemkin_label(chem_path):
     with open(chem_path, 'r') as f:
         start, end = find_blocks(f, head_pat=r'SPECIES',
                                 tail_pat=r'END', regex=True)[0]
-        read_block(f, action, start, end)
+        read_block(f, start, end, action=action)
     return rmg_to_chemkin, chemkin_to_rmg
 
 
@@ -77,7 +90,8 @@ def combine_spc_list(spc_list1, spc_list2, same_source=True, resonance=True):
     
     Returns:
         spc_list (list): A list contains all of the species in spc_list1 and 
-                         spc_list2
+                         spc_list2. When not from the same source, the species
+                         are deduplicated by their structures
     """
     # If same source, then just compare the label
     if same_source:
@@ -86,26 +100,334 @@ def combine_spc_list(spc_list1, spc_list2, same_source=True, resonance=True):
     # If not same source, compare the structure
     else:
         spc_list = list()
+        index = StructureIndex()
         for spc in spc_list1:
-            if 'smiles' in spc.keys():
-                spc_list.append(Species().from_smiles(spc['smiles']))
-            elif 'adjlist' in spc.keys():
-                spc_list.append(Species().from_adjacency_list(spc['adjlist']))
+            species = get_spc_from_info(spc)
+            if species:
+                index.add(species, spc)
+                spc_list.append(spc)
         for spc in spc_list2:
-            if 'smiles' in spc.keys():
-                species = Species().from_smiles(spc['smiles'])
-            elif 'adjlist' in spc.keys():
-                species = Species().from_adjacency_list(spc['adjlist'])
+            species = get_spc_from_info(spc)
+            if not species:
+                continue
             if resonance:
-                species.generate_resonance_structures()
-            for species1 in spc_list:
-                if species1.is_isomorphic(species):
-                    break
-            else:
+                generate_resonance_structures(species)
+            if index.find(species) is None:
+                index.add(species, spc)
                 spc_list.append(spc)
     return spc_list
 
 
+def get_spc_from_info(spc_info):
+    """
+    Get species from the species info used in ARC input files
+
+    Args:
+        spc_info (dict): The species info containing SMILES or adjacency list
+
+    Returns:
+        (RMG Species): an RMG species object. None if no structure is available
+    """
+    if isinstance(spc_info, Species):
+        return spc_info
+    if 'smiles' in spc_info.keys():
+        return Species().from_smiles(spc_info['smiles'])
+    elif 'adjlist' in spc_info.keys():
+        return Species().from_adjacency_list(spc_info['adjlist'])
+
+
+class StructureIndex(object):
+    """
+    An index of structures bucketed by their structure keys, so that isomorphism
+    is only checked between the structures with the same key. The structures
+    whose keys are not available are compared with all structures.
+
+    The structures can be RMG Species, Molecule, or a list of resonance structures.
+    The keys of a query include all of its resonance structures, while the keys
+    of the indexed structures only include their representative structures.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.unkeyed = []
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self.buckets.values()) + len(self.unkeyed)
+
+    def add(self, item, value=None):
+        """
+        Add a structure to the index
+
+        Args:
+            item (RMG Species/Molecule): The structure
+            value: The value returned when the structure is found. By default, the item
+        """
+        value = item if value is None else value
+        key = get_structure_key(_get_molecules(item)[0])
+        if key:
+            self.buckets.setdefault(key, []).append((item, value))
+        else:
+            self.unkeyed.append((item, value))
+
+    def find(self, item):
+        """
+        Find the value of an indexed structure isomorphic to the item
+
+        Args:
+            item (RMG Species/Molecule): The structure to search
+
+        Returns:
+            The value of the isomorphic structure. None if not found
+        """
+        candidates = []
+        keys = set(get_structure_key(molecule) for molecule in _get_molecules(item))
+        for key in keys:
+            candidates.extend(self.buckets.get(key, []))
+        # Structures without key need a full comparison
+        if None in keys:
+            candidates = [pair for bucket in self.buckets.values() for pair in bucket]
+        candidates.extend(self.unkeyed)
+        for indexed, value in candidates:
+            if _is_isomorphic(item, indexed):
+                return value
+
+
+class SpeciesDictionary(OrderedDict):
+    """
+    An ordered dictionary of species keyed by their labels. The structure
+    index of the species is built on the first structure query and then
+    maintained incrementally, so that checking if a structure is in the
+    dictionary does not compare it with every species.
+
+    The labels added since the dictionary is read from or written to a
+    dictionary file are tracked, so that only the new entries need to be
+    appended when writing the same file again.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._index = None
+        self._synced = None
+        self._dirty = OrderedDict()
+        self._compact = False
+        super(SpeciesDictionary, self).__init__(*args, **kwargs)
+
+    def __setitem__(self, label, spc):
+        if label in self:
+            # The replaced species cannot be removed from the index
+            self._index = None
+            self._removed(label)
+        super(SpeciesDictionary, self).__setitem__(label, spc)
+        self._dirty[label] = None
+        if self._index is not None:
+            self._index.add(spc, label)
+
+    def __delitem__(self, label):
+        super(SpeciesDictionary, self).__delitem__(label)
+        self._index = None
+        self._removed(label)
+
+    def __reduce__(self):
+        # Do not copy or pickle the index and the tracked changes
+        return self.__class__, (), None, None, iter(self.items())
+
+    def pop(self, *args):
+        if args and args[0] in self:
+            self._index = None
+            self._removed(args[0])
+        return super(SpeciesDictionary, self).pop(*args)
+
+    def popitem(self, *args, **kwargs):
+        label, spc = super(SpeciesDictionary, self).popitem(*args, **kwargs)
+        self._index = None
+        self._removed(label)
+        return label, spc
+
+    def clear(self):
+        self._index = None
+        self._dirty.clear()
+        self._compact = True
+        super(SpeciesDictionary, self).clear()
+
+    def _removed(self, label):
+        """
+        Track the removal of a label. A written entry cannot be removed
+        from the dictionary file without rewriting the file.
+        """
+        if label in self._dirty:
+            del self._dirty[label]
+        else:
+            self._compact = True
+
+    def mark_synced(self, path):
+        """
+        Mark the dictionary as identical to the dictionary file at path
+
+        Args:
+            path (str): the path to the dictionary file
+        """
+        stat = os.stat(path)
+        self._synced = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        self._dirty.clear()
+        self._compact = False
+
+    def get_appendable_labels(self, path):
+        """
+        Get the labels to be appended to the dictionary file to keep it
+        identical to the dictionary
+
+        Args:
+            path (str): the path to the dictionary file
+
+        Returns:
+            (list): The labels to be appended. None if the file needs to be
+                    rewritten, i.e., the file is not written from this dictionary,
+                    the file is modified, or entries are replaced or removed.
+        """
+        if self._compact or not self._synced or not os.path.isfile(path):
+            return
+        stat = os.stat(path)
+        if self._synced != (os.path.abspath(path), stat.st_size, stat.st_mtime_ns):
+            return
+        return list(self._dirty)
+
+    def find_isomorphic(self, spc):
+        """
+        Find the label of the species isomorphic to spc
+
+        Args:
+            spc (RMG Species/Molecule): The species to search
+
+        Returns:
+            (str): The label of the isomorphic species. None if not found
+        """
+        if self._index is None:
+            self._index = StructureIndex()
+            for label, species in self.items():
+                self._index.add(species, label)
+        return self._index.find(spc)
+
+    def add_many(self, spc_list):
+        """
+        Add species to the dictionary. The species whose labels are used or
+        whose structures are in the dictionary are not added
+
+        Args:
+            spc_list (list): A list of labeled species, or (label, species) pairs
+
+        Returns:
+            labels (list): The labels of the species added
+        """
+        labels = list()
+        for spc in spc_list:
+            if isinstance(spc, tuple):
+                label, spc = spc
+                spc.label = label
+            if add_spc(spc, self):
+                labels.append(spc.label)
+        return labels
+
+
+class LazySpeciesDictionary(MutableMapping):
+    """
+    An ordered species dictionary backed by a dictionary file. Only the labels
+    and the positions of the entries are indexed when created, and a species
+    is parsed from the file when its label is accessed for the first time.
+    A DatabaseError is raised on the access if the file has been modified
+    since it was indexed.
+    """
+
+    def __init__(self, dict_path, resonance=True):
+        self.path = dict_path
+        self.resonance = resonance
+        self._offsets = OrderedDict()
+        self._species = dict()
+        self._stat = None
+        self._index_file()
+
+    def __getitem__(self, label):
+        if label not in self._species:
+            start, end = self._offsets[label]
+            with open(self.path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                if (stat.st_size, stat.st_mtime_ns) != self._stat:
+                    raise DatabaseError('The species dictionary {0} is modified after '
+                                        'being indexed.'.format(self.path))
+                f.seek(start)
+                adjlist = f.read(end - start).decode('utf-8')
+            self._species[label] = parse_spc_dict_entry(adjlist, resonance=self.resonance)
+        return self._species[label]
+
+    def __setitem__(self, label, spc):
+        self._species[label] = spc
+        if label not in self._offsets:
+            self._offsets[label] = None
+
+    def __delitem__(self, label):
+        del self._offsets[label]
+        self._species.pop(label, None)
+
+    def __iter__(self):
+        return iter(self._offsets)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __contains__(self, label):
+        return label in self._offsets
+
+    def _index_file(self):
+        """
+        Index the labels and the positions of the entries within a single pass.
+        Entries are separated by blank lines, and labeled by their first lines.
+        """
+        with open(self.path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self._stat = (stat.st_size, stat.st_mtime_ns)
+            pos, start, label = 0, None, None
+            for line in iter_block(f):
+                if line.strip():
+                    if start is None:
+                        start, label = pos, None
+                    # Normalized the same as parse_spc_dict_entry
+                    content = line.split()[0] if b'InChI' in line else line
+                    content = content.split(b'//')[0].split()
+                    if label is None and content:
+                        label = content[0].decode('utf-8') if len(content) == 1 else ''
+                elif start is not None:
+                    self._add_offsets(label, start, pos)
+                    start = None
+                pos += len(line)
+            if start is not None:
+                self._add_offsets(label, start, pos)
+
+    def _add_offsets(self, label, start, end):
+        if label is None:
+            # Only comments in the entry
+            return
+        if label in self._offsets:
+            raise DatabaseError('Species label "{0}" used for multiple species in {1}.'.format(
+                label, self.path))
+        self._offsets[label] = (start, end)
+
+
+def _get_molecules(item):
+    """
+    Get the list of molecules of a species, a molecule, or a list of molecules
+    """
+    if isinstance(item, Species):
+        return item.molecule
+    return item if isinstance(item, list) else [item]
+
+
+def _is_isomorphic(item1, item2):
+    """
+    Check if two structures (RMG Species or Molecule) are isomorphic
+    """
+    return any(molecule1.is_isomorphic(molecule2)
+               for molecule1 in _get_molecules(item1)
+               for molecule2 in _get_molecules(item2))
+
+
 def read_spc_list_from_yml(yml_file):
     """
     Read the species contained in a yaml file. The function assumes
@@ -143,21 +465,24 @@ def read_spc_list_from_yml(yml_file):
     return spc_list
 
 
-def write_spc_list_to_yml(spc_info, yml_file, mode='backup', info_type='smiles'):
+def write_spc_list_to_yml(spc_info, yml_file, mode='backup', info_type='smiles', processes=None):
     """
     Write the species to a yaml file format. The function lists
-    species under the key "species". 
+    species under the key "species". The species are serialized in a
+    process pool and streamed into the file in order.
     
     Args:
         spc_info (list): A iterable datastructure containing species info
         yml_file (str): The path to a new/existed yml file
         mode (str): 'backup' or 'overwrite'
         info_type (str): By default, it will write SMILES
+        processes (int): The number of processes used to serialize species. By default,
+                         a process pool is only used for SERIALIZE_POOL_MIN_SIZE or more
     """
     exist = os.path.isfile(yml_file)
     if exist:
         try:
-            content = read_yaml_file(yml_file)
+            content = read_yaml_file(yml_file) or {}
         except:
             content = {}
             mode = 'backup'
@@ -169,47 +494,171 @@ def write_spc_list_to_yml(spc_info, yml_file, mode='backup', info_type='smiles')
     else:
         target = os.path.join(os.path.dirname(yml_file),
                               'new_' + os.path.basename(yml_file))
-    spc_list = list()
-    if isinstance(spc_info, list):
-        for entry in spc_info:
-            d = {}
-            if entry.label:
-                d['label'] = entry.label
-            else:
-                d['label'] = entry.molecule[0].to_smiles().replace('#', '_')
-            if info_type == 'smiles':
-                d['smiles'] = entry.molecule[0].to_smiles()
-            elif info_type == 'adjlist':
-                d['adjlist'] = entry.to_adjacency_list()
-            d['multiplicity'] = entry.multiplicity
-            spc_list.append(d)
-            logging.info('Writing the species %s into the yaml file' %
-                     (d['label']))
-    else:
-        pass
-    if 'species' in content.keys() or not content:
-        content['species'] = spc_list
+    if not isinstance(spc_info, list):
+        spc_info = []
+    # Keep the other contents only if the file is a species list
+    if 'species' in content.keys():
+        content.pop('species')
     else:
         content = {}
-        content['species'] = spc_list
-    write_yaml_file(target, content)
+    t0 = time.time()
+    with atomic_open(target) as f:
+        if content:
+            yaml.dump(data=content, stream=f, Dumper=YamlDumper)
+        f.write('species:' + ('\n' if spc_info else ' []\n'))
+        items = [(entry.label, entry, info_type) for entry in spc_info]
+        for d in map_in_pool(_serialize_spc, items,
+                             processes=_get_serialize_processes(len(items), processes)):
+            yaml.dump(data=[d], stream=f, Dumper=YamlDumper)
+            logging.debug('Writing the species %s into the yaml file' % (d['label']))
+    t = time.time() - t0
+    logging.info('Wrote {0} species into {1} in {2:.2f} s ({3:.0f} species/s)'.format(
+        len(spc_info), target, t, len(spc_info) / t if t else float('inf')))
 
 
-def read_spc_dict_from_path(dict_path):
+def _get_serialize_processes(n_spc, processes=None):
     """
-    Read species dictionary given the dictionary file path
+    Get the number of processes to serialize the species. Without the number
+    given, serialize in the current process below SERIALIZE_POOL_MIN_SIZE species
+    """
+    if processes is None and n_spc < SERIALIZE_POOL_MIN_SIZE:
+        return 1
+    return processes
+
+
+def _serialize_spc(args):
+    """
+    Serialize a species into the species info used in ARC input files.
+    SMILES is only generated once for each species.
+
+    Args:
+        args (tuple): The label, the species and the info type, which is 'smiles',
+                      'adjlist' or 'arc' (both SMILES and adjacency list)
+
+    Returns:
+        d (dict): The species info
+    """
+    label, spc, info_type = args
+    d = {}
+    smiles = spc.molecule[0].to_smiles() if info_type != 'adjlist' or not label else None
+    d['label'] = label or smiles.replace('#', '_')
+    if info_type == 'smiles':
+        d['smiles'] = smiles
+    elif info_type == 'adjlist':
+        d['adjlist'] = spc.to_adjacency_list()
+    elif info_type == 'arc':
+        d['smiles'] = smiles
+        d['adjlist'] = spc.molecule[0].to_adjacency_list()
+    d['multiplicity'] = spc.multiplicity
+    return d
+
+
+def read_spc_dict_from_path(dict_path, snapshot=True, lazy=False):
+    """
+    Read species dictionary given the dictionary file path. A compiled
+    snapshot of the dictionary is written next to the dictionary file
+    (as [dict_path].pkl), and it is loaded instead of parsing the
+    dictionary file as long as the file is not modified.
     
     Args:
         dict_path (str): the absolute path to species dictionary
+        snapshot (bool): whether to use the compiled snapshot
+        lazy (bool): whether to only parse the species when accessed,
+                     which is preferred if only a few species are used
     
     Returns:
-        spc_dict (OrderedDict): an ordered dictionary has all species information
+        spc_dict (SpeciesDictionary/LazySpeciesDictionary): an ordered dictionary
+                                                            has all species information
     """
-    lib = KineticsLibrary()
-    spc_dict = lib.get_species(dict_path)
+    if lazy:
+        return LazySpeciesDictionary(dict_path)
+    spc_dict = read_spc_dict_snapshot(dict_path) if snapshot else None
+    if spc_dict is None:
+        lib = KineticsLibrary()
+        spc_dict = SpeciesDictionary(lib.get_species(dict_path))
+        if snapshot:
+            write_spc_dict_snapshot(spc_dict, dict_path)
+    spc_dict.mark_synced(dict_path)
     return spc_dict
 
 
+def parse_spc_dict_entry(adjlist, resonance=True):
+    """
+    Parse an entry of the species dictionary into a species, following the
+    rules used by RMG when reading species dictionaries
+
+    Args:
+        adjlist (str): The labeled adjacency list of the entry
+        resonance (bool): Whether to generate the resonance structures
+
+    Returns:
+        spc (RMG Species): The species of the entry
+    """
+    lines = list()
+    for line in adjlist.splitlines(True):
+        if 'InChI' in line:
+            line = line.split()[0] + '\n'
+        if '//' in line:
+            line = line[0:line.index('//')] + '\n'
+        lines.append(line)
+    spc = Species().from_adjacency_list(''.join(lines))
+    if resonance:
+        generate_resonance_structures(spc)
+    return spc
+
+
+def read_spc_dict_snapshot(dict_path):
+    """
+    Read the compiled snapshot of a species dictionary. The snapshot is valid
+    if the size and the modification time of the dictionary file are unchanged,
+    or if the contents of the dictionary file have the same digest
+
+    Args:
+        dict_path (str): the absolute path to species dictionary
+
+    Returns:
+        spc_dict (SpeciesDictionary): the species dictionary. None if the
+                                      snapshot is not available or stale
+    """
+    snapshot_path = dict_path + '.pkl'
+    if not os.path.isfile(snapshot_path):
+        return
+    try:
+        with open(snapshot_path, 'rb') as f:
+            snapshot = pickle.load(f)
+        stat = os.stat(dict_path)
+        if snapshot['size'] != stat.st_size:
+            return
+        if snapshot['mtime'] != stat.st_mtime_ns \
+                and snapshot['digest'] != get_file_digest(dict_path):
+            return
+    except Exception as e:
+        logging.debug('The snapshot {0} is not readable ({1}).'.format(snapshot_path, e))
+        return
+    return snapshot['spc_dict']
+
+
+def write_spc_dict_snapshot(spc_dict, dict_path):
+    """
+    Write the compiled snapshot of a species dictionary read from dict_path
+
+    Args:
+        spc_dict (dict): the species dictionary read from the dictionary file
+        dict_path (str): the absolute path to species dictionary
+    """
+    snapshot_path = dict_path + '.pkl'
+    try:
+        stat = os.stat(dict_path)
+        snapshot = {'size': stat.st_size,
+                    'mtime': stat.st_mtime_ns,
+                    'digest': get_file_digest(dict_path),
+                    'spc_dict': spc_dict}
+        with atomic_open(snapshot_path, 'wb') as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        logging.debug('Failed to write the snapshot {0} ({1}).'.format(snapshot_path, e))
+
+
 def get_spc_from_id(identifier):
     """
     Get species according to the string input
@@ -254,65 +703,146 @@ def add_spc_to_spc_dict(label, identifier, spc_dict, interactive=False):
         spc = get_spc_from_id(identifier)
     if spc:
         spc.label = label
-        if spc_dict:
-            # Check if the label is used
-            for label in spc_dict.keys():
-                if spc.label == label:
-                    logging.warn('The label {0} is used, corresponding to species {1}.'
-                                 ' Addition abort.'.format(label, spc.molecule[0].to_smiles()))
-                    return
-            # Check if the species is contained
-            spc.generate_resonance_structures()
-            for species in spc_dict.values():
-                if spc.is_isomorphic(species):
-                    logging.warn('The species {0} is included, corresponding to label {1}'
-                                 ' Addition abort.'.format(spc.molecule[0].to_smiles(), species.label))
-                    return
-        # Otherwise, it is okay to update the species dictionary
-        spc_dict.update({spc.label: spc})
-        logging.info('The species {0} is added, the smiles structure is {1}'.
-                    format(spc.label, spc.molecule[0].to_smiles()))
-        if interactive:
+        if add_spc(spc, spc_dict) and interactive:
             return spc.label
 
 
-def write_spc_dict_to_path(spc_dict, path):
+def add_spc(spc, spc_dict):
+    """
+    Add a species to the species dictionary if neither its label
+    nor its structure is in the species dictionary
+
+    Args:
+        spc (RMG Species): The species to be added, labeled
+        spc_dict (dict): The species dictionary
+
+    Returns:
+        (bool): True if the species is added
+    """
+    if spc_dict:
+        # Check if the label is used
+        if spc.label in spc_dict:
+            logging.warn('The label {0} is used, corresponding to species {1}.'
+                         ' Addition abort.'.format(spc.label, spc.molecule[0].to_smiles()))
+            return False
+        # Check if the species is contained
+        generate_resonance_structures(spc)
+        label = find_isomorphic_label(spc, spc_dict)
+        if label is not None:
+            logging.warn('The species {0} is included, corresponding to label {1}'
+                         ' Addition abort.'.format(spc.molecule[0].to_smiles(), label))
+            return False
+    # Otherwise, it is okay to update the species dictionary
+    spc_dict.update({spc.label: spc})
+    logging.info('The species {0} is added, the smiles structure is {1}'.
+                 format(spc.label, spc.molecule[0].to_smiles()))
+    return True
+
+
+def find_isomorphic_label(spc, spc_dict):
     """
-    Save species dictionary (spc_dict) to the dictionary path
+    Find the label of the species in the species dictionary isomorphic to spc
+
+    Args:
+        spc (RMG Species): The species to search
+        spc_dict (dict): The species dictionary, or a ChainMap overlaying
+                         species dictionaries
+
+    Returns:
+        (str): The label of the isomorphic species. None if not found
+    """
+    if isinstance(spc_dict, ChainMap):
+        for spc_map in spc_dict.maps:
+            label = find_isomorphic_label(spc, spc_map)
+            if label is not None:
+                return label
+        return
+    if isinstance(spc_dict, SpeciesDictionary):
+        return spc_dict.find_isomorphic(spc)
+    return next((label for label, species in spc_dict.items()
+                 if spc.is_isomorphic(species)), None)
+
+
+def write_spc_dict_to_path(spc_dict, path, incremental=True):
+    """
+    Save species dictionary (spc_dict) to the dictionary path. If the
+    species dictionary is a SpeciesDictionary read from or written to
+    the same path, only the new entries are appended to the file, unless
+    entries are replaced or removed, where the file is rewritten.
     
     Args:
         spc_dict (OrderedDict): an ordered dictionary has all species information
         path (str): the absolute path to save species dictionary
+        incremental (bool): whether to only append the new entries if possible
     """
-    if not os.path.isdir(os.path.dirname(path)):
-        os.mkdir(os.path.dirname(path))
-    with open(path, 'w+') as f:
-        for label in spc_dict.keys():
-            f.write(spc_dict[label].molecule[0].to_adjacency_list(
-                label=label, remove_h=False))
-            f.write('\n')
+    labels = None
+    if incremental and isinstance(spc_dict, SpeciesDictionary):
+        labels = spc_dict.get_appendable_labels(path)
+    if labels is None:
+        with atomic_open(path) as f:
+            for label in spc_dict.keys():
+                _write_spc_dict_entry(f, label, spc_dict[label])
+    elif labels:
+        separator = _get_entry_separator(path)
+        with open(path, 'a') as f:
+            # Keep the new entries apart from the last adjacency list
+            f.write(separator)
+            for label in labels:
+                _write_spc_dict_entry(f, label, spc_dict[label])
+    else:
+        return
+    if isinstance(spc_dict, SpeciesDictionary):
+        spc_dict.mark_synced(path)
     logging.warn('Species dictionary is updated (at %s)' %(path))
 
 
-def spc_dict_to_arc_input(spc_dict):
+def _get_entry_separator(path):
+    """
+    Get the text needed to end the dictionary file with a blank line, so that
+    an entry appended is not merged into the last adjacency list
+
+    Args:
+        path (str): the path to the dictionary file
+
+    Returns:
+        (str): The separator, empty if the file is empty or ends with a blank line
+    """
+    with open(path, 'rb') as f:
+        f.seek(max(0, os.path.getsize(path) - 4))
+        tail = f.read().replace(b'\r', b'')
+    if not tail or tail.endswith(b'\n\n'):
+        return ''
+    return '\n' if tail.endswith(b'\n') else '\n\n'
+
+
+def _write_spc_dict_entry(f, label, spc):
+    """
+    Write an entry into the species dictionary file
+
+    Args:
+        f (fileObject): A python fileObject
+        label (str): The label of the entry
+        spc (RMG Species): The species of the entry
+    """
+    f.write(spc.molecule[0].to_adjacency_list(label=label, remove_h=False))
+    f.write('\n')
+
+
+def spc_dict_to_arc_input(spc_dict, processes=None):
     """
     Convert a species dictionary to an ARC input format
     
     Args:
         spc_dict (dict): A dictionary contains species information
+        processes (int): The number of processes used to serialize species. By default,
+                         a process pool is only used for SERIALIZE_POOL_MIN_SIZE or more
     
     Returns:
         spc_list (list): A list contains equivalent species information in ARC format
     """
-    spc_list = list()
-    for label, spc in spc_dict.items():
-        d = {}
-        d['label'] = label
-        d['smiles'] = spc.molecule[0].to_smiles()
-        d['adjlist'] = spc.molecule[0].to_adjacency_list()
-        d['multiplicity'] = spc.multiplicity
-        spc_list.append(d)
-    return spc_list
+    items = [(label, spc, 'arc') for label, spc in spc_dict.items()]
+    return list(map_in_pool(_serialize_spc, items,
+                            processes=_get_serialize_processes(len(items), processes)))
 
 
 def spc_dict_to_spc_list(spc_dict):
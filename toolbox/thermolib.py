@@ -3,10 +3,12 @@
 The toolbox for thermo library related tasks
 """
 
-import glob
 import logging
 import os
+import re
+from collections import OrderedDict
 from copy import deepcopy
+from functools import lru_cache
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -15,72 +17,170 @@ from rmgpy.data.base import Entry
 from rmgpy.data.thermo import ThermoLibrary, ThermoDatabase
 from rmgpy.thermo.thermodata import ThermoData
 
+from toolbox.base import has_file_cache, iter_files, load_libs_in_pool, read_file_cache, \
+                         read_libs_by_paths, write_file_cache
+from toolbox.molecule import generate_resonance_structures
+from toolbox.species import StructureIndex
+
 ##################################################################
 
-def find_thermo_libs(path):
+# The patterns to check the header of a thermo library file
+THERMO_LIB_NAME = re.compile(rb'^name\s*=', re.MULTILINE)
+THERMO_LIB_ENTRY = re.compile(rb'^entry\s*\(', re.MULTILINE)
+THERMO_LIB_DATA = re.compile(rb'^\s*thermo\s*=', re.MULTILINE)
+
+
+def find_thermo_libs(path, load=False, use_cache=True, processes=None):
     """
     This function search for the thermo library
-    based on /thermo/*.py or /libraries/*.py
+    based on /thermo/*.py or /libraries/*.py. The files are validated
+    by their headers, or by the cache of the loaded libraries
     
     Args:
         path (str): The path to project directories
+        load (bool): Load the libraries found in a process pool
+        use_cache (bool): Use the cached libraries if the library files are unchanged
+        processes (int): The number of processes used to load the libraries
     
     Returns:
         thermo_lib_list (list): Entries of the path to thermo libraries
+        or, if load,
+        thermo_libs (OrderedDict): The loaded thermo libraries by their paths
     """
-    # Initiate the thermo lib list
     thermo_lib_list = list()
-    # Walk through the dirs under path
-    for root_p, dirs, _ in os.walk(path):
-        if not dirs:
+    for lib_path in sorted(iter_files(path, regex=r'\.py$')):
+        if os.path.basename(os.path.dirname(lib_path)) not in ['thermo', 'libraries']:
             continue
-        # Use ARC folder organization to check thermo library
-        chk_path = os.path.join(root_p, 'thermo')
-        if os.path.isdir(chk_path):
-            # Find the corresponding thermo lib file
-            thermo_lib = glob.glob(os.path.join(chk_path, '*.py'))[0]
-            # Check the lib is valid by loading it
-            if thermo_lib:
-                try:
-                    lib = ThermoLibrary()
-                    lib.load(thermo_lib, ThermoDatabase().local_context, ThermoDatabase().global_context)
-                except:
-                    continue
-                else:
-                    thermo_lib_list.append(thermo_lib)
-                    logging.info("Find thermo library at {0}".format(thermo_lib))
-    return thermo_lib_list
-
-
-def read_thermo_lib_by_path(lib_path, thermo_db):
+        if is_thermo_lib_file(lib_path) \
+                or (use_cache and has_file_cache('thermo_libraries', [lib_path])):
+            thermo_lib_list.append(lib_path)
+            logging.info("Find thermo library at {0}".format(lib_path))
+    if not load:
+        return thermo_lib_list
+    thermo_libs = OrderedDict()
+    for lib_path, lib, _ in load_libs_in_pool(load_thermo_lib, thermo_lib_list,
+                                              use_cache=use_cache, processes=processes):
+        if lib is None:
+            logging.error('The library file %s is not vaild.' % (lib_path))
+            continue
+        lib.label = lib_path
+        thermo_libs[lib_path] = lib
+    return thermo_libs
+
+
+def is_thermo_lib_file(lib_path, size=65536):
+    """
+    Check if a file is a thermo library by its header, without loading it
+
+    Args:
+        lib_path (str): Path to the file
+        size (int): The number of bytes to check
+
+    Returns:
+        (bool): True if the file looks like a thermo library
+    """
+    try:
+        with open(lib_path, 'rb') as f:
+            head = f.read(size)
+    except OSError:
+        return False
+    if not THERMO_LIB_NAME.search(head):
+        return False
+    # Libraries without entries are valid as well
+    return bool(THERMO_LIB_DATA.search(head)) or not THERMO_LIB_ENTRY.search(head)
+
+
+def read_thermo_lib_by_path(lib_path, thermo_db, overwrite=False, use_cache=True):
     """
     Read thermo library given its library path
     
     Args:
         lib_path (str): Path to thermo library file
         thermo_database (ThermoDatabase): RMG thermo database object
+        overwrite (bool): Reload the library if it is already in the database
+        use_cache (bool): Use the cached library if the library file is unchanged
     """
     if not os.path.exists(lib_path):
         logging.error('The library file %s does not exist.' %(lib_path))
         return
-    if lib_path not in thermo_db.library_order:
-        lib = ThermoLibrary()
-        try:
-            lib.load(lib_path, ThermoDatabase().local_context,
-                    ThermoDatabase().global_context)
-        except:
+    if lib_path not in thermo_db.library_order or overwrite:
+        lib = load_thermo_lib(lib_path, use_cache=use_cache)
+        if lib is None:
             logging.error('The library file %s is not vaild.' % (lib_path))
             return
         else:
             lib.label = lib_path
             thermo_db.libraries[lib.label] = lib
-            thermo_db.library_order.append(lib.label)
+            if lib.label not in thermo_db.library_order:
+                thermo_db.library_order.append(lib.label)
             logging.info('Loading thermodynamics library {1} from {0} ...'.format(
             os.path.split(lib_path)[0], os.path.split(lib_path)[1]),)
     else:
         logging.warning('The library %s has already been loaded' %(lib_path))
 
 
+def read_thermo_libs_by_paths(lib_paths, thermo_db, overwrite=False, use_cache=True,
+                              processes=None):
+    """
+    Read thermo libraries given their library paths. The libraries are loaded
+    in a process pool and added to the database in the order of the paths.
+
+    Args:
+        lib_paths (list): Paths to thermo library files
+        thermo_db (ThermoDatabase): RMG thermo database object
+        overwrite (bool): Reload the libraries already in the database
+        use_cache (bool): Use the cached libraries if the library files are unchanged
+        processes (int): The number of processes. Run in the current process if 1
+
+    Returns:
+        report (dict): The loaded libraries with their loading times in seconds,
+                       the failed libraries, and the skipped libraries
+    """
+    return read_libs_by_paths(load_thermo_lib, lib_paths, thermo_db, kind='thermodynamics',
+                              overwrite=overwrite, use_cache=use_cache, processes=processes)
+
+
+def load_thermo_lib(lib_path, use_cache=True):
+    """
+    Load a RMG thermo library from its file path. The loaded library is cached
+    under CACHE_DIR, and it is read from the cache next time if the library
+    file is unchanged.
+
+    Args:
+        lib_path (str): Path to thermo library file
+        use_cache (bool): Use and update the cache
+
+    Returns:
+        lib (RMG ThermoLibrary): The library. None if the library is not valid
+    """
+    if use_cache:
+        lib = read_file_cache('thermo_libraries', [lib_path])
+        if lib is not None:
+            return lib
+    lib = ThermoLibrary()
+    try:
+        lib.load(lib_path, *get_thermo_contexts())
+    except Exception as e:
+        logging.debug('Failed to load the library file %s (%s).' % (lib_path, e))
+        return
+    if use_cache:
+        write_file_cache(lib, 'thermo_libraries', [lib_path])
+    return lib
+
+
+@lru_cache(maxsize=1)
+def get_thermo_contexts():
+    """
+    Get the local and global contexts to load thermo libraries, which
+    are created once and shared
+
+    Returns:
+        (tuple): The local context and the global context
+    """
+    thermo_db = ThermoDatabase()
+    return thermo_db.local_context, thermo_db.global_context
+
+
 def merge_thermo_lib(base_lib, lib_to_add):
     """
     Merge one library (lib_to_add) into the base library
@@ -89,23 +189,23 @@ def merge_thermo_lib(base_lib, lib_to_add):
         base_lib (RMG thermo library): The library used as the base
         lib_to_add (RMG thermo library): The library to be added to the base library
     """
+    # Index the species in the base library by their structures
+    base_index = StructureIndex()
+    for base_spc in base_lib.entries.values():
+        base_index.add(base_spc.item, base_spc)
     for spc_label, spc in lib_to_add.entries.items():
         # Check the entry merging info
         if "Added to the base library {}".format(base_lib.label) in spc.short_desc \
                 or "Not used in the base library {}".format(base_lib.label) in spc.short_desc:
             continue
-        # Loop through the species in the base library to check duplicates
-        for _, base_spc in base_lib.entries.items():
-            spc.item.generate_resonance_structures()
-            if spc.item.is_isomorphic(base_spc.item):
-                in_base = True
-                break
-        else:
-            in_base = False
+        # Check duplicates among the species in the base library with the same structure key
+        resonance = generate_resonance_structures(spc.item)
+        base_spc = base_index.find(resonance)
         # if the entry is not in the base library, add its complete info into the base library
-        if not in_base:
+        if base_spc is None:
             spc.index = len(base_lib.entries)
             base_lib.entries.update({spc_label: deepcopy(spc)})
+            base_index.add(base_lib.entries[spc_label].item, base_lib.entries[spc_label])
             spc.short_desc += "\nAdded to the base library {}".format(
                 base_lib.label)
             logging.info("The thermo of {0} is added from {1}".format(